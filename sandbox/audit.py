@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Append-only, hash-chained audit trail (Interfaces: "Audit trail (immutable logs)").
+
+Layout of an audit directory:
+    segment-000001.jsonl   records, one canonical JSON object per line
+    segment-000002.jsonl   (a new segment starts when the current one exceeds `segment_bytes`)
+    index.jsonl            case_id → (segment, offset) pointers
+    checkpoint.json        last verified (segment, offset, seq, hash)
+
+Each record stores `prev` (hash of the previous record) and `hash` =
+SHA-256(prev + canonical record body), so any edit or deletion breaks the
+chain. Writers enqueue events; a background thread group-commits them (one
+write + one fsync per batch), so logging an event does not wait on the disk.
+A batch that fails mid-write is cut off again, and on open the log drops a
+torn last line and rebuilds the index if it lags the segments.
+Verification reads segments through mmap and resumes from the last checkpoint.
+
+CLI:
+    python audit.py verify .audit/<tenant_id> [--full] [--checkpoint]
+    python audit.py case .audit/<tenant_id> CASE-123
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+GENESIS = "0" * 64
+SEGMENT_FMT = "segment-{:06d}.jsonl"
+
+
+def _canonical(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def record_hash(prev: str, body: Dict[str, Any]) -> str:
+    """Chain hash of a record body (all fields except 'hash')."""
+    return hashlib.sha256(prev.encode("ascii") + _canonical(body)).hexdigest()
+
+
+@dataclass
+class VerifyResult:
+    ok: bool
+    records: int                  # records checked in this run
+    last_seq: int
+    error: Optional[str] = None
+    segment: Optional[str] = None
+    offset: Optional[int] = None
+
+
+class AuditLog:
+    """
+    Thread-safe audit log. `append()` returns a Future resolved with the record
+    once its batch is durable; callers that do not need durability ignore it.
+
+    `read_only=True` opens an existing log for verification and lookups only:
+    no tail recovery (which would truncate a live writer's in-progress line),
+    no writer thread, `append()` raises, a lagging index is rebuilt in memory
+    only, and `verify()` leaves checkpoint.json alone unless asked to write it.
+    """
+
+    def __init__(self, directory: Path, *, segment_bytes: int = 64 * 1024 * 1024,
+                 max_batch: int = 512, max_delay: float = 0.05, fsync: bool = True, read_only: bool = False):
+        self.dir = Path(directory)
+        self.read_only = read_only
+        if read_only:
+            if not self.dir.is_dir():
+                raise FileNotFoundError(f"audit directory not found: {self.dir}")
+        else:
+            self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.fsync = fsync
+
+        self._queue: "queue.Queue[Optional[Tuple[Optional[Dict[str, Any]], Future]]]" = queue.Queue()
+        self._index: Dict[str, List[Tuple[str, int]]] = {}
+        self._index_lock = threading.Lock()
+        self._seq, self._prev = (0, GENESIS) if read_only else self._recover()
+        self._segment: Optional[Path] = None
+        self._segment_size = 0
+        self._load_index()
+        if self._index_lags():
+            self.rebuild_index(write=not read_only)
+        self._closed = read_only
+        self._writer: Optional[threading.Thread] = None
+        if not read_only:
+            self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._writer.start()
+
+    # --- startup ---
+    def _segments(self) -> List[Path]:
+        return sorted(self.dir.glob("segment-*.jsonl"))
+
+    def _recover(self) -> Tuple[int, str]:
+        """Find the chain head (last seq/hash); truncate back to the last complete record after a crash."""
+        segs = self._segments()
+        if not segs:
+            return 0, GENESIS
+        last = segs[-1]
+        with open(last, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            while end:
+                start = data.rfind(b"\n", 0, end - 1) + 1
+                try:
+                    json.loads(data[start:end])
+                    break
+                except ValueError:
+                    end = start  # a newline-terminated but torn record (partial batch write)
+            if end != len(data):
+                f.truncate(end)
+            data = data[:end]
+        lines = data.splitlines()
+        if not lines:
+            if len(segs) > 1:
+                prev_lines = segs[-2].read_bytes().splitlines()
+                rec = json.loads(prev_lines[-1])
+                return rec["seq"], rec["hash"]
+            return 0, GENESIS
+        rec = json.loads(lines[-1])
+        return rec["seq"], rec["hash"]
+
+    def _load_index(self) -> None:
+        path = self.dir / "index.jsonl"
+        if not path.exists():
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    case_id, seg, off = json.loads(line)
+                except ValueError:
+                    continue  # torn last line
+                self._index.setdefault(case_id, []).append((seg, off))
+
+    def _index_lags(self) -> bool:
+        """
+        True when index.jsonl is behind the segments (a crash between the
+        segment and index writes) or points past their end. Only the records
+        after the last indexed one are read.
+        """
+        last = max((ptr for ptrs in self._index.values() for ptr in ptrs), default=None)
+        if last is not None:
+            path = self.dir / last[0]
+            if not path.exists() or path.stat().st_size <= last[1]:
+                return True
+        start_seg, start_off = last if last is not None else (None, 0)
+        for seg_name, off, _, rec in self._scan(start_seg, start_off):
+            if (seg_name, off) != last and rec.get("case_id"):
+                return True
+        return False
+
+    # --- writing ---
+    def append(self, event: str, *, case_id: Optional[str] = None, actor: Optional[str] = None,
+               **data: Any) -> Future:
+        if self._closed:
+            raise RuntimeError("audit log is read-only" if self.read_only else "audit log is closed")
+        fut: Future = Future()
+        self._queue.put(({"event": event, "case_id": case_id, "actor": actor, "data": data}, fut))
+        return fut
+
+    def _current_segment(self) -> Tuple[Path, int]:
+        """Segment to append to and its current size (rolls over past `segment_bytes`)."""
+        if self._segment is None:
+            segs = self._segments()
+            self._segment = segs[-1] if segs else self.dir / SEGMENT_FMT.format(1)
+            self._segment_size = self._segment.stat().st_size if self._segment.exists() else 0
+        if self._segment_size >= self.segment_bytes:
+            self._segment = self.dir / SEGMENT_FMT.format(int(self._segment.stem.split("-")[1]) + 1)
+            self._segment_size = 0
+        return self._segment, self._segment_size
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[Tuple[Optional[Dict[str, Any]], Future]]) -> None:
+        """Write a batch with a single write + fsync; flush markers (body None) resolve afterwards."""
+        try:
+            seg, offset = self._current_segment()
+            buf, done, index_entries = bytearray(), [], []
+            seq, prev = self._seq, self._prev
+            for body, fut in batch:
+                if body is None:
+                    done.append((fut, None))
+                    continue
+                seq += 1
+                rec = {"seq": seq, "ts": datetime.now(timezone.utc).isoformat(timespec="microseconds"),
+                       "prev": prev, **body}
+                rec["hash"] = prev = record_hash(rec["prev"], rec)
+                if rec["case_id"]:
+                    index_entries.append((rec["case_id"], seg.name, offset + len(buf)))
+                buf += _canonical(rec) + b"\n"
+                done.append((fut, rec))
+
+            if buf:
+                try:
+                    with open(seg, "ab") as f:
+                        f.write(buf)
+                        f.flush()
+                        if self.fsync:
+                            os.fsync(f.fileno())
+                except OSError:
+                    # Cut off whatever part of the batch reached the file, so the next batch starts on a clean line
+                    self._segment = None
+                    if seg.exists() and seg.stat().st_size > offset:
+                        os.truncate(seg, offset)
+                    raise
+                self._segment_size = offset + len(buf)
+            if index_entries:
+                # The index is derived data (rebuildable from segments), so it is not fsynced
+                with open(self.dir / "index.jsonl", "ab") as f:
+                    f.write(b"".join(_canonical(list(e)) + b"\n" for e in index_entries))
+                with self._index_lock:
+                    for case_id, seg_name, off in index_entries:
+                        self._index.setdefault(case_id, []).append((seg_name, off))
+            self._seq, self._prev = seq, prev
+            for fut, rec in done:
+                fut.set_result(rec)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything appended so far is durable."""
+        marker: Future = Future()
+        self._queue.put((None, marker))
+        marker.result(timeout)
+
+    def close(self) -> None:
+        if self._writer is not None and not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+
+    # --- reading ---
+    def records_for_case(self, case_id: str) -> List[Dict[str, Any]]:
+        with self._index_lock:
+            ptrs = list(self._index.get(case_id, []))
+        out = []
+        for seg_name, off in ptrs:
+            with open(self.dir / seg_name, "rb") as f:
+                f.seek(off)
+                out.append(json.loads(f.readline()))
+        return out
+
+    def _scan(self, start_segment: Optional[str] = None, start_offset: int = 0
+              ) -> Iterator[Tuple[str, int, int, Dict[str, Any]]]:
+        """Yield (segment, start, end, record) in chain order, reading segments through mmap."""
+        for seg in self._segments():
+            if start_segment and seg.name < start_segment:
+                continue
+            pos = start_offset if seg.name == start_segment else 0
+            size = seg.stat().st_size
+            if size <= pos:
+                continue
+            with open(seg, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while pos < size:
+                    end = mm.find(b"\n", pos)
+                    if end < 0:
+                        break  # torn tail; the writer truncates it on restart
+                    yield seg.name, pos, end + 1, json.loads(mm[pos:end])
+                    pos = end + 1
+
+    def rebuild_index(self, write: bool = True) -> int:
+        """
+        Regenerate the case index from the segments (e.g. after a crash between
+        segment and index writes); `write=False` rebuilds it in memory only.
+        """
+        index: Dict[str, List[Tuple[str, int]]] = {}
+        lines = []
+        for seg_name, off, _, rec in self._scan():
+            if rec.get("case_id"):
+                index.setdefault(rec["case_id"], []).append((seg_name, off))
+                lines.append(_canonical([rec["case_id"], seg_name, off]) + b"\n")
+        if write:
+            tmp = self.dir / "index.jsonl.tmp"
+            tmp.write_bytes(b"".join(lines))
+            os.replace(tmp, self.dir / "index.jsonl")
+        with self._index_lock:
+            self._index = index
+        return len(lines)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        for _, _, _, rec in self._scan():
+            yield rec
+
+    # --- verification ---
+    def _read_checkpoint(self) -> Dict[str, Any]:
+        path = self.dir / "checkpoint.json"
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return {"segment": None, "offset": 0, "seq": 0, "hash": GENESIS}
+
+    def _write_checkpoint(self, cp: Dict[str, Any]) -> None:
+        tmp = self.dir / "checkpoint.json.tmp"
+        tmp.write_text(json.dumps(cp), encoding="utf-8")
+        os.replace(tmp, self.dir / "checkpoint.json")
+
+    def _check_checkpoint(self, cp: Dict[str, Any]) -> Optional[str]:
+        """
+        Make sure the already-verified prefix is still there before resuming:
+        segments up to the checkpointed one are numbered without gaps, that
+        segment still reaches `offset`, and the record ending at `offset` has
+        the checkpointed seq and hash.
+        """
+        if cp["segment"] is None:
+            return None
+        numbers = [int(seg.stem.split("-")[1]) for seg in self._segments() if seg.name <= cp["segment"]]
+        if numbers != list(range(1, len(numbers) + 1)):
+            return "segment missing before checkpoint"
+        path = self.dir / cp["segment"]
+        if not path.exists():
+            return "checkpointed segment missing"
+        end = cp["offset"]
+        if path.stat().st_size < end or end <= 0:
+            return "segment truncated below checkpoint"
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[end - 1:end] != b"\n":
+                return "checkpointed record changed"
+            start = mm.rfind(b"\n", 0, end - 1) + 1
+            try:
+                rec = json.loads(mm[start:end - 1])
+            except ValueError:
+                return "checkpointed record changed"
+        if rec.get("seq") != cp["seq"] or rec.get("hash") != cp["hash"]:
+            return "checkpointed record changed"
+        return None
+
+    def verify(self, *, full: bool = False, write_checkpoint: Optional[bool] = None) -> VerifyResult:
+        """
+        Check the hash chain. By default resumes after the last checkpoint and
+        only reads new records, after confirming the checkpointed record is
+        still intact; `full=True` re-verifies from genesis. The checkpoint
+        advances only when the checked range is intact, and only if
+        `write_checkpoint` (default: not `read_only`).
+        """
+        if write_checkpoint is None:
+            write_checkpoint = not self.read_only
+        cp = {"segment": None, "offset": 0, "seq": 0, "hash": GENESIS} if full else self._read_checkpoint()
+        error = self._check_checkpoint(cp)
+        if error:
+            return VerifyResult(False, 0, cp["seq"], error, cp["segment"], cp["offset"])
+        seq, prev = cp["seq"], cp["hash"]
+        count = 0
+        seg_name, next_off = cp["segment"], cp["offset"]
+        for seg_name, off, next_off, rec in self._scan(cp["segment"], cp["offset"]):
+            body = {k: v for k, v in rec.items() if k != "hash"}
+            if rec.get("seq") != seq + 1 or rec.get("prev") != prev:
+                return VerifyResult(False, count, seq, "broken chain link", seg_name, off)
+            if record_hash(prev, body) != rec.get("hash"):
+                return VerifyResult(False, count, seq, "hash mismatch", seg_name, off)
+            seq, prev = rec["seq"], rec["hash"]
+            count += 1
+        if count and write_checkpoint:
+            self._write_checkpoint({"segment": seg_name, "offset": next_off, "seq": seq, "hash": prev})
+        return VerifyResult(True, count, seq)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Inspect or verify an audit trail directory.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    v = sub.add_parser("verify", help="check the hash chain (incremental from the last checkpoint)")
+    v.add_argument("dir", type=Path)
+    v.add_argument("--full", action="store_true", help="re-verify from genesis")
+    v.add_argument("--checkpoint", action="store_true", help="save the verified position so the next run resumes there")
+    c = sub.add_parser("case", help="print all records of a case")
+    c.add_argument("dir", type=Path)
+    c.add_argument("case_id")
+    args = ap.parse_args(argv)
+
+    try:
+        log = AuditLog(args.dir, read_only=True)  # safe next to a running app: no recovery, no writer
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 2
+    try:
+        if args.cmd == "verify":
+            res = log.verify(full=args.full, write_checkpoint=args.checkpoint)
+            print(json.dumps(res.__dict__))
+            return 0 if res.ok else 1
+        for rec in log.records_for_case(args.case_id):
+            print(json.dumps(rec, ensure_ascii=False))
+        return 0
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
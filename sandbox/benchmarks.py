@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark suite for the app's hot paths (no Streamlit, no network,
+stub embedding model). Results are written as JSON and can be compared with a
+previous run to catch regressions before deploy. The comparison uses the best
+(min) sample of each benchmark and ignores slowdowns smaller than
+`--min-delta-us`, so microsecond-scale timings do not flap between runs.
+
+Usage (from the sandbox directory):
+    python benchmarks.py --out bench/current.json
+    python benchmarks.py --out bench/current.json --compare bench/baseline.json --threshold 1.25
+    python benchmarks.py --filter roi
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from icons_svg import ICON_NAMES, build_icons_html
+from reporting import ImpactInputs, bullets_from_multiline, build_checklist, build_draft, compute_impact, compute_impact_batch
+from step4_tools import build_registry, run_step4
+
+BASE = Path(__file__).resolve().parent
+
+# Registered benchmarks: name → zero-arg callable built by a setup function
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function returning the callable to time (setup cost is excluded)."""
+    def decorator(setup: Callable[[], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+# -----------------------------
+# Impact ROI
+# -----------------------------
+@benchmark("roi.scalar")
+def _roi_scalar():
+    inp = ImpactInputs()
+    return lambda: compute_impact(inp)
+
+
+@benchmark("roi.batch_100k")
+def _roi_batch():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    cols = {
+        "reports_per_month": rng.integers(0, 500, n),
+        "reject_rate_pct": rng.uniform(0, 40, n),
+        "minutes_now": rng.integers(10, 90, n),
+        "deploy_cost_monthly_usd": rng.uniform(0, 2000, n),
+        "risk_level": rng.choice(["Low", "Medium", "High"], n),
+    }
+    return lambda: compute_impact_batch(cols)
+
+
+# -----------------------------
+# Playground checklist / draft
+# -----------------------------
+_EVOLUTION = "\n".join(f"2025-09-{d:02d}: physiotherapy session {d}, pain {10 - d % 10}/10" for d in range(1, 29))
+
+
+def _playground_submit(uncached: bool):
+    """The Playground's submit path: graph lookups, the step-4 tool batch, checklist and draft."""
+    from knowledge_graph import PayerKnowledgeGraph
+    from tenants import DEFAULT_TENANT, load_tenants
+    tenants = load_tenants()
+    tenant = tenants.get(DEFAULT_TENANT) or next(iter(tenants.values()))
+    kg = PayerKnowledgeGraph.from_tenant(tenant, [tenant.knowledge_graph] if tenant.knowledge_graph else [])
+    registry = build_registry()
+    form = dict(insurer="SaludPlus", trigger="outpatient surgery", diagnosis="acute lumbosciatica",
+                date_val=date(2025, 9, 30), case_id="F-1234", evolution=_EVOLUTION)
+
+    def run():
+        if uncached:
+            kg._cache.clear()
+            kg._rules.clear()
+            registry.clear_cache()
+        attachments = kg.required_attachments(form["insurer"], form["trigger"])
+        kg.benefits_for(form["insurer"], form["trigger"])
+        run_step4(registry, insurer=form["insurer"], trigger=form["trigger"], diagnosis=form["diagnosis"],
+                  professional="Dr. Example", evolution=form["evolution"], rules=kg.rules_for(form["insurer"]))
+        build_checklist(attachments=attachments, compliance_label=tenant.compliance_label, **form)
+        build_draft(professional="Dr. Example", compliance_label=tenant.compliance_label, **form)
+    return run
+
+
+@benchmark("playground.submit")
+def _playground():
+    return _playground_submit(uncached=False)
+
+
+@benchmark("playground.submit_uncached")
+def _playground_uncached():
+    return _playground_submit(uncached=True)
+
+
+@benchmark("bullets.large_50k_lines")
+def _bullets_large():
+    text = "\n".join(f"  2025-09-{i % 28 + 1:02d}: entry number {i}  " if i % 7 else "" for i in range(50_000))
+    return lambda: bullets_from_multiline(text)
+
+
+# -----------------------------
+# Payer knowledge graph (checklist lookups)
+# -----------------------------
+def _knowledge_graph():
+    from knowledge_graph import PayerKnowledgeGraph
+    from tenants import TenantConfig
+    kg = PayerKnowledgeGraph.from_tenant(TenantConfig("bench", "Bench"), [BASE / "payer_kg.example.ttl"])
+    kg.set_requirements(["Prescription with number of sessions"], insurer="SaludPlus", trigger="therapy")
+    return kg
+
+
+@benchmark("kg.required_attachments_uncached")
+def _kg_uncached():
+    kg = _knowledge_graph()
+
+    def run():
+        kg._cache.clear()
+        return kg.required_attachments("SaludPlus", "outpatient surgery then therapy")
+    return run
+
+
+@benchmark("kg.required_attachments_cached")
+def _kg_cached():
+    kg = _knowledge_graph()
+    return lambda: kg.required_attachments("SaludPlus", "outpatient surgery then therapy")
+
+
+# -----------------------------
+# Diagrams
+# -----------------------------
+@benchmark("diagram.architecture_dot")
+def _diagram_dot():
+    from diagrams import make_architecture_diagram
+    return lambda: make_architecture_diagram("HIPAA / GDPR", True, True).source
+
+
+@benchmark("icons.svg_assembly")
+def _icons_svg():
+    import base64
+    icon_dir = BASE / "assets" / "icons"
+    icons = {}
+    for n in ICON_NAMES:
+        p = icon_dir / f"{n}.png"
+        data = p.read_bytes() if p.exists() else b"\x00" * 4096
+        icons[n] = "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+    return lambda: build_icons_html(icons)
+
+
+# -----------------------------
+# Retrieval (demo 1's retriever, stub embeddings)
+# -----------------------------
+class StubEmbedder:
+    """Deterministic hashing embedder standing in for SentenceTransformer (dim 384)."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, t in enumerate(texts):
+            for tok in t.lower().split():
+                h = int.from_bytes(hashlib.blake2b(tok.encode(), digest_size=8).digest(), "little")
+                out[i, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1.0, norms)
+
+
+def notebook_function(notebook: Path, name: str, namespace: Dict[str, Any]) -> Callable[..., Any]:
+    """Compile the top-level function `name` from a notebook's code cells, with `namespace` as its globals."""
+    for cell in json.loads(notebook.read_text(encoding="utf-8"))["cells"]:
+        if cell["cell_type"] != "code":
+            continue
+        try:
+            tree = ast.parse("".join(cell["source"]))
+        except SyntaxError:  # IPython magics
+            continue
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name == name:
+                exec(compile(ast.Module([node], type_ignores=[]), str(notebook), "exec"), namespace)
+                return namespace[name]
+    raise LookupError(f"No function {name!r} in {notebook.name}")
+
+
+@benchmark("retrieval.demo1_top2_10k_docs")
+def _retrieval():
+    import faiss  # optional (faiss-cpu, workshop stack); missing → skipped
+    topics = ["diabetes type 2 high glucose", "revenue growth supply chain", "hypertension lifestyle changes",
+              "earnings call production costs", "lumbosciatica physiotherapy", "outpatient surgery discharge"]
+    documents = [f"Document {i}: {topics[i % len(topics)]} note {i}" for i in range(10_000)]
+    model = StubEmbedder()
+    index = faiss.IndexFlatL2(model.dim)
+    index.add(model.encode(documents))
+    # demo 1's own retriever(query, top_k), bound to the stub model and a 10k-document index
+    retriever = notebook_function(BASE / "codes_for_Lior_Bootcamp_talk_sept2025_demo1.ipynb", "retriever",
+                                  {"embedding_model": model, "faiss_index": index, "documents": documents})
+    return lambda: retriever("What did the company say about production costs?")
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+def time_callable(fn: Callable[[], Any], repeat: int = 7, min_time: float = 0.05) -> Dict[str, float]:
+    """asv-style timing: calibrate calls per sample to last ≥ min_time, then take `repeat` samples."""
+    fn()  # warm-up
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= min_time or number >= 1_000_000:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(names: List[str], repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in names:
+        try:
+            fn = BENCHMARKS[name]()
+        except ImportError as e:  # optional dependency missing (e.g. graphviz)
+            print(f"{name:40s} skipped ({e})")
+            continue
+        r = time_callable(fn, repeat=repeat)
+        results[name] = r
+        print(f"{name:40s} median {r['median_s']*1e3:10.3f} ms   (min {r['min_s']*1e3:.3f} ms, n={r['number']})")
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            min_delta_s: float = 20e-6) -> List[str]:
+    """
+    Names whose best time got slower than `threshold` × baseline by more than
+    `min_delta_s`. The min sample is the least noisy estimate of the code's own
+    cost; the absolute floor keeps microsecond jitter from failing the gate.
+    """
+    regressions = []
+    for name, r in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ratio = r["min_s"] / base["min_s"] if base["min_s"] else float("inf")
+        slower = ratio > threshold and r["min_s"] - base["min_s"] > min_delta_s
+        flag = "REGRESSION" if slower else ""
+        print(f"{name:40s} {ratio:6.2f}x  {(r['min_s'] - base['min_s']) * 1e6:+10.1f} us  {flag}")
+        if slower:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", type=Path, help="write results JSON here")
+    ap.add_argument("--compare", type=Path, help="baseline results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="max allowed slowdown ratio (of min times)")
+    ap.add_argument("--min-delta-us", type=float, default=20.0,
+                    help="slowdowns smaller than this many microseconds are never regressions")
+    ap.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    ap.add_argument("--repeat", type=int, default=15)
+    args = ap.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if args.filter in n]
+    current = run(names, args.repeat)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.2f}x, min delta {args.min_delta_us:.0f} us):")
+        regressions = compare(current, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold,
+                              args.min_delta_us * 1e-6)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Graphviz builders for the executive-summary diagrams (architecture and
+problem/solution). Sidebar settings are passed in as arguments so the DOT
+source can be generated without Streamlit.
+"""
+from __future__ import annotations
+
+from graphviz import Digraph
+
+# -----------------------------
+# Helper to prefix numbered labels
+# -----------------------------
+def num(i: int, text: str, show_numbers: bool = True) -> str:
+    return f"({i}) {text}" if show_numbers else text
+
+# -----------------------------
+# Architecture diagram
+# -----------------------------
+def make_architecture_diagram(compliance_label: str = "HIPAA / GDPR", show_numbers: bool = True,
+                              show_hitl: bool = True) -> Digraph:
+    g = Digraph("architecture", graph_attr={
+        "rankdir": "LR",
+        "splines": "spline",
+        "fontname": "Helvetica"
+    }, node_attr={
+        "shape": "box",
+        "style": "rounded",
+        "fontname": "Helvetica"
+    }, edge_attr={
+        "fontname": "Helvetica"
+    })
+
+    # External actors
+    g.node("patient", "Patient")
+    g.node("medical", "Medical Act\n(trigger)")
+    g.node("insurer", "Health Insurance\nCompany")
+
+    # Secure boundary
+    with g.subgraph(name="cluster_boundary") as b:
+        b.attr(label=f"Secure Boundary — {compliance_label}")
+        b.attr(style="rounded")
+        b.node("profile", "Agent Profile")
+        b.node("llm", "LLM")
+        b.node("sysmsg", "System Message")
+
+        # Agent orchestrator
+        with b.subgraph(name="cluster_agent") as a:
+            a.attr(label='AI Agent "Orchestrator"\\nPlanning • Coordination • Autonomy')
+            a.attr(style="rounded")
+            a.node("agent", "Agent Orchestrator")
+
+        # Cognition/tooling
+        with b.subgraph(name="cluster_cognition") as c:
+            c.attr(label="Capabilities")
+            c.attr(style="rounded")
+            c.node("memory", "Memory")
+            c.node("knowledge", "Knowledge")
+            c.node("tools", "Tools")
+
+        # Optional Human in the Loop
+        if show_hitl:
+            b.node("hitl", "Human-in-the-Loop", style="dashed")
+
+        # Internal edges
+        b.edge("agent", "memory", label=num(4, "read/write", show_numbers), dir="both")
+        b.edge("agent", "knowledge", label=num(4, "retrieve", show_numbers), dir="both")
+        b.edge("agent", "tools", label=num(4, "invoke", show_numbers), dir="both")
+        b.edge("agent", "llm", label=num(5, "reason / generate", show_numbers), dir="both")
+        b.edge("sysmsg", "agent", label=num(6, "policy & guardrails", show_numbers))
+        b.edge("agent", "sysmsg", label=num(7, "status & rationale", show_numbers))
+        if show_hitl:
+            b.edge("hitl", "agent", style="dashed", label=num(9, "review & approve", show_numbers), dir="both")
+
+    # Edges crossing the boundary
+    g.edge("medical", "profile", label=num(1, "trigger", show_numbers))
+    g.edge("patient", "profile", label=num(2, "requirement / request", show_numbers))
+    g.edge("insurer", "profile", label=num(3, "payer rules / plan data", show_numbers))
+    g.edge("insurer", "sysmsg", label=num(8, "notifications & validation", show_numbers), dir="both")
+
+    # Layout nudges
+    g.edge("profile", "agent", style="invis")  # helps place profile near agent
+    return g
+
+# -----------------------------
+# Problem & solution diagram
+# -----------------------------
+def make_problem_solution_diagram() -> Digraph:
+    g = Digraph("problem_solution", graph_attr={
+        "rankdir": "TB",
+        "splines": "spline",
+        "fontname": "Helvetica"
+    }, node_attr={
+        "shape": "box",
+        "style": "rounded",
+        "fontname": "Helvetica"
+    }, edge_attr={
+        "fontname": "Helvetica"
+    })
+
+    g.node("problem", "Problem: Activating health insurance benefits requires complete, timely, compliant medical reports")
+
+    with g.subgraph(name="cluster_roles") as r:
+        r.attr(label="Friction by Stakeholder", style="rounded")
+        r.node("mp", "Medical Professionals\n• admin burden\n• report quality varies")
+        r.node("pt", "Patients\n• no/slow access to benefits")
+        r.node("ic", "Insurance Company\n• weak orchestration\n• manual reviews")
+        r.edge("mp", "problem")
+        r.edge("pt", "problem")
+        r.edge("ic", "problem")
+
+    with g.subgraph(name="cluster_effects") as e:
+        e.attr(label="Downstream Effects", style="rounded")
+        e.node("unfinished", "Unfinished reports")
+        e.node("delayed", "Delayed submissions")
+        e.node("rejected", "Rejected claims")
+        e.edge("problem", "unfinished")
+        e.edge("problem", "delayed")
+        e.edge("problem", "rejected")
+
+    with g.subgraph(name="cluster_solution") as s:
+        s.attr(label="Solution", style="rounded")
+        s.node("orchestrator", "AI Agent Orchestrator\n• guides structured reporting\n• validates & completes docs\n• coordinates with payer\n• keeps humans in the loop")
+        s.node("outcomes", "Outcomes\n• faster benefits\n• fewer rejections\n• auditability & compliance")
+        s.edge("orchestrator", "outcomes")
+
+    g.edge("problem", "orchestrator", label="address with")
+    return g
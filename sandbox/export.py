@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Export of report drafts as PDF + canonical JSON, signed with a local key.
+
+- Canonical JSON: sorted keys, compact separators, UTF-8 (stable bytes to sign).
+- Signature: HMAC-SHA256 with a key file kept next to the app (created on first
+  use). The JSON envelope carries the PDF's SHA-256, so one signature covers both.
+- Bulk export streams cases from an iterable through a worker pool with a
+  bounded in-flight window and writes each result straight into a ZIP on disk.
+  The CLI uses a process pool; the app uses threads (see ExportService).
+
+CLI (bulk):
+    python export.py cases.jsonl reports.zip --workers 4 --compliance-label "HIPAA"
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import tempfile
+import textwrap
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional
+
+from reporting import build_draft
+
+SCHEMA = "health-report/v1"
+SIGNATURE_ALG = "HMAC-SHA256"
+DEFAULT_KEY_PATH = Path(os.environ.get("REPORT_SIGNING_KEY_FILE", Path(__file__).resolve().parent / ".keys" / "report_signing.key"))
+
+CASE_FIELDS = ("insurer", "trigger", "diagnosis", "date_val", "professional", "case_id", "evolution")
+
+# A4 page, points
+PAGE_W, PAGE_H = 595, 842
+MARGIN, FONT_SIZE, LINE_H, WRAP = 54, 10, 13, 95
+# Base-14 Helvetica only covers Latin-1; map common typography to ASCII
+_PDF_SAFE = str.maketrans({"—": "-", "–": "-", "•": "*", "→": "->", "“": '"', "”": '"', "‘": "'", "’": "'", "…": "..."})
+
+
+# -----------------------------
+# Canonical JSON & signing
+# -----------------------------
+def canonical_json(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+class Signer:
+    """HMAC signer backed by a local key file."""
+
+    def __init__(self, key: bytes):
+        self.key = key
+        self.key_id = hashlib.sha256(key).hexdigest()[:16]
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_KEY_PATH) -> "Signer":
+        """
+        Load the key, creating it on first use. A new key is written to a temp
+        file and hard-linked into place, so concurrent processes never see a
+        partial key: exactly one link wins, and every caller re-reads the winner.
+        """
+        path = Path(path)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)  # created 0o600
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(secrets.token_bytes(32))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.link(tmp, path)
+            except FileExistsError:
+                pass  # another process created it first; use theirs
+            finally:
+                os.unlink(tmp)
+        return cls(path.read_bytes())
+
+    def sign(self, data: bytes) -> str:
+        return hmac.new(self.key, data, hashlib.sha256).hexdigest()
+
+    def verify(self, data: bytes, signature: str) -> bool:
+        return hmac.compare_digest(self.sign(data), signature)
+
+    def envelope(self, payload: Mapping[str, Any]) -> bytes:
+        """Canonical JSON `{payload, signature}` where the signature covers canonical(payload)."""
+        return canonical_json({
+            "payload": payload,
+            "signature": {"alg": SIGNATURE_ALG, "key_id": self.key_id, "value": self.sign(canonical_json(payload))},
+        })
+
+
+# -----------------------------
+# PDF rendering
+# -----------------------------
+def render_pdf(text: str, *, title: str = "Medical report", author: str = "", created: str = "") -> bytes:
+    """Render plain text to a paginated A4 PDF (pymupdf). Output is deterministic for the same inputs."""
+    try:
+        import pymupdf
+    except ImportError:  # pymupdf < 1.24 only ships the legacy module name
+        import fitz as pymupdf
+
+    lines = [
+        line
+        for raw in text.translate(_PDF_SAFE).splitlines() or [""]
+        for line in textwrap.wrap(raw, WRAP, replace_whitespace=False, drop_whitespace=False) or [""]
+    ]
+    per_page = (PAGE_H - 2 * MARGIN) // LINE_H
+    doc = pymupdf.open()
+    # One insert per page: per-line inserts dominate render time
+    for start in range(0, len(lines), per_page):
+        page = doc.new_page(width=PAGE_W, height=PAGE_H)
+        page.insert_text((MARGIN, MARGIN + FONT_SIZE), "\n".join(lines[start:start + per_page]),
+                         fontsize=FONT_SIZE, fontname="helv", lineheight=LINE_H / FONT_SIZE)
+    pdf_date = "D:" + "".join(ch for ch in created if ch.isdigit())[:14] if created else ""
+    doc.set_metadata({
+        "title": title,
+        "author": author,
+        "creator": "AI Agent Orchestrator",
+        "producer": "AI Agent Orchestrator",
+        "creationDate": pdf_date,
+        "modDate": pdf_date,
+    })
+    data = doc.tobytes(garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    return data
+
+
+# -----------------------------
+# Single case export
+# -----------------------------
+@dataclass
+class ExportBundle:
+    name: str         # base file name (no extension)
+    pdf: bytes
+    json: bytes       # signed canonical JSON envelope
+
+
+def _export_name(case: Mapping[str, Any]) -> str:
+    ident = str(case.get("case_id") or "").strip() or hashlib.sha256(canonical_json(dict(case))).hexdigest()[:12]
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in ident)
+    return f"report_{safe}"
+
+
+def export_case(case: Mapping[str, Any], signer: Signer, compliance_label: Optional[str] = None) -> ExportBundle:
+    """
+    PDF + signed JSON for one case (form fields as in the Playground; optional
+    'draft', 'generated_at'). Cases without a draft get one built with the
+    tenant's `compliance_label` (None → the report default).
+    """
+    fields = {k: str(case.get(k) or "") for k in CASE_FIELDS}
+    label = {"compliance_label": compliance_label} if compliance_label else {}
+    draft = case.get("draft") or build_draft(**fields, **label)
+    generated_at = str(case.get("generated_at") or datetime.now().isoformat(timespec="seconds"))
+
+    pdf = render_pdf(draft, title=f"Medical report {fields['case_id']}".strip(),
+                     author=fields["professional"], created=generated_at)
+    payload = {
+        "schema": SCHEMA,
+        "case": fields,
+        "draft": draft,
+        "generated_at": generated_at,
+        "pdf_sha256": hashlib.sha256(pdf).hexdigest(),
+    }
+    return ExportBundle(_export_name(case), pdf, signer.envelope(payload))
+
+
+def verify_export(json_bytes: bytes, signer: Signer, pdf: Optional[bytes] = None) -> bool:
+    """Check the envelope signature and, if given, that the PDF matches the signed hash."""
+    env = json.loads(json_bytes)
+    payload, sig = env["payload"], env["signature"]
+    if sig.get("alg") != SIGNATURE_ALG or not signer.verify(canonical_json(payload), sig.get("value", "")):
+        return False
+    return pdf is None or hashlib.sha256(pdf).hexdigest() == payload.get("pdf_sha256")
+
+
+# -----------------------------
+# Bulk export (streaming → ZIP)
+# -----------------------------
+def _export_worker(case: Mapping[str, Any], key: bytes, compliance_label: Optional[str]) -> ExportBundle:
+    return export_case(case, Signer(key), compliance_label)
+
+
+def bounded_map(executor: Executor, fn: Callable[..., Any], items: Iterable[Any], *args: Any,
+                window: int = 32) -> Iterator[Any]:
+    """Like executor.map, but pulls from `items` lazily and keeps at most `window` tasks in flight."""
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def bulk_export_zip(cases: Iterable[Mapping[str, Any]], out_path: Path, signer: Signer, *,
+                    workers: Optional[int] = None, window: int = 32, compliance_label: Optional[str] = None,
+                    progress: Optional[Callable[[int], None]] = None,
+                    executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """
+    Export every case into one ZIP (`<name>.pdf`, `<name>.json`, plus MANIFEST.jsonl).
+    Memory is bounded by `window` bundles; the ZIP is written incrementally to disk.
+    Cases render on `executor` if given, else on a private process pool of
+    `workers` processes (only safe in a single-threaded process such as the CLI).
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".part")
+    manifest = []
+    seen: Dict[str, int] = {}
+    count = 0
+    try:
+        with (nullcontext(executor) if executor else ProcessPoolExecutor(max_workers=workers)) as pool, \
+                zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for bundle in bounded_map(pool, _export_worker, cases, signer.key, compliance_label, window=window):
+                n = seen.get(bundle.name, 0)
+                seen[bundle.name] = n + 1
+                name = bundle.name if n == 0 else f"{bundle.name}_{n}"
+                zf.writestr(f"{name}.pdf", bundle.pdf)
+                zf.writestr(f"{name}.json", bundle.json)
+                manifest.append(canonical_json({"name": name, "json_sha256": hashlib.sha256(bundle.json).hexdigest()}))
+                count += 1
+                if progress:
+                    progress(count)
+            zf.writestr("MANIFEST.jsonl", b"\n".join(manifest) + b"\n")
+            zf.writestr("MANIFEST.sig", signer.envelope({
+                "schema": SCHEMA, "count": count,
+                "manifest_sha256": hashlib.sha256(b"\n".join(manifest) + b"\n").hexdigest(),
+            }))
+        os.replace(tmp_path, out_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)  # only left behind when the export failed
+    return {"path": str(out_path), "count": count, "bytes": out_path.stat().st_size}
+
+
+def iter_cases_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream cases from a JSON-lines file (one case object per line)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# -----------------------------
+# Non-blocking service for the UI
+# -----------------------------
+class ExportService:
+    """
+    Shared exporter for Streamlit sessions. Single exports are memoized (small
+    LRU) so PDF and JSON downloads of the same case render once; bulk jobs run
+    on a background thread and return a Future. Bulk cases render on a thread
+    pool: the server is multi-threaded, so forking it is unsafe, and spawned
+    workers would re-run the Streamlit script (it is `__main__`). Drafts missing
+    from bulk cases are built with the tenant's `compliance_label`.
+    """
+
+    def __init__(self, signer: Signer, max_jobs: int = 2, cache_size: int = 64,
+                 compliance_label: Optional[str] = None):
+        self.signer = signer
+        self.compliance_label = compliance_label
+        self._max_jobs = max_jobs
+        self._jobs: Optional[ThreadPoolExecutor] = None
+        self._cache: "OrderedDict[str, ExportBundle]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def export(self, case: Mapping[str, Any]) -> ExportBundle:
+        key = hashlib.sha256(canonical_json(dict(case))).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        bundle = export_case(case, self.signer, self.compliance_label)
+        with self._lock:
+            self._cache[key] = bundle
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return bundle
+
+    @staticmethod
+    def export_name(case: Mapping[str, Any]) -> str:
+        return _export_name(case)
+
+    def signed_json(self, payload: Mapping[str, Any]) -> bytes:
+        return self.signer.envelope(payload)
+
+    def submit_bulk(self, cases: Iterable[Mapping[str, Any]], out_path: Path, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._jobs is None:
+                self._jobs = ThreadPoolExecutor(max_workers=self._max_jobs, thread_name_prefix="export")
+            kwargs.setdefault("compliance_label", self.compliance_label)
+            return self._jobs.submit(self._bulk, cases, out_path, **kwargs)
+
+    def _bulk(self, cases: Iterable[Mapping[str, Any]], out_path: Path, *, workers: Optional[int] = None,
+              **kwargs: Any) -> Dict[str, Any]:
+        with ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                thread_name_prefix="export-render") as pool:
+            return bulk_export_zip(cases, out_path, self.signer, executor=pool, **kwargs)
+
+    def close(self) -> None:
+        """
+        Drop cached bundles and release the job pool. Running bulk jobs finish
+        in the background, and the service stays usable: a session still
+        holding it after eviction gets a fresh pool on its next bulk job.
+        """
+        with self._lock:
+            jobs, self._jobs = self._jobs, None
+            self._cache.clear()
+        if jobs is not None:
+            jobs.shutdown(wait=False)
+
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(description="Bulk export cases (JSONL) to a ZIP of signed PDF + JSON reports.")
+    ap.add_argument("cases", type=Path, help="JSON-lines file with one case per line")
+    ap.add_argument("out", type=Path, help="output .zip path")
+    ap.add_argument("--key", type=Path, default=DEFAULT_KEY_PATH, help="signing key file (created if missing)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--window", type=int, default=32, help="max cases in flight")
+    ap.add_argument("--compliance-label", default=None, help="label for drafts built from case fields")
+    args = ap.parse_args(argv)
+
+    summary = bulk_export_zip(iter_cases_jsonl(args.cases), args.out, Signer.from_file(args.key),
+                              workers=args.workers, window=args.window, compliance_label=args.compliance_label)
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
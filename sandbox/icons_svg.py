@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Responsive SVG for the "Architecture (Icons)" page: fixed node layout, edges
+and the HTML wrapper. Icons are passed in as data: URIs so this module stays
+free of Streamlit and file I/O.
+"""
+from __future__ import annotations
+
+from html import escape as html_escape
+from typing import Dict
+
+ICON_NAMES = [
+    "agent_profile","orchestrator","llm","system","langchain","langgraph",
+    "memory","knowledge","tools","patient","clinician","insurer","mcp",
+]
+
+# -----------------------------
+# Canvas & layout (intrinsic SVG coordinates)
+# -----------------------------
+VW, VH = 1200, 720       # internal SVG width/height; scales responsively
+NODE_W, NODE_H = 180, 120
+ICON_SIZE = 48
+
+
+def pos(x, y):
+    """Top-left (x,y) plus center coordinates for edge endpoints."""
+    return {"x": x, "y": y, "cx": x + NODE_W/2, "cy": y + NODE_H/2}
+
+
+nodes = {
+    # External actors
+    "patient":      pos(  40, 100),
+    "clinician":    pos(  40, 280),
+    "insurer":      pos(  40, 460),
+    # Compliance boundary (center)
+    "profile":      pos( 320, 280),
+    "orchestrator": pos( 560, 280),
+    "llm":          pos( 560, 120),
+    "system":       pos( 560, 440),
+    "langchain":    pos( 800, 180),
+    "langgraph":    pos( 800, 380),
+    "memory":       pos(1020, 120),
+    "knowledge":    pos(1020, 280),
+    "tools":        pos(1020, 440),
+    # Interoperability
+    "mcp":          pos( 800, 560),
+}
+
+# Edges: (src, dst, label, style) where style is "solid" or "dashed-bidir"
+edges = [
+    ("patient","profile","", "solid"),
+    ("clinician","profile","", "solid"),
+    ("insurer","profile","", "solid"),
+    ("profile","orchestrator","context","solid"),
+    ("orchestrator","llm","", "solid"),
+    ("system","orchestrator","policy","solid"),
+    ("orchestrator","langchain","", "solid"),
+    ("orchestrator","langgraph","", "solid"),
+    ("langchain","memory","", "solid"),
+    ("langchain","knowledge","", "solid"),
+    ("langchain","tools","", "solid"),
+    ("langgraph","memory","", "solid"),
+    ("langgraph","tools","", "solid"),
+    ("orchestrator","insurer","reports/status","solid"),
+    ("insurer","system","rules/templates","solid"),
+    ("mcp","orchestrator","interop","dashed-bidir"),  # bidirectional interop
+]
+
+# -----------------------------
+# SVG building blocks
+# -----------------------------
+def node_g(key: str, title: str, icon_uri: str, highlight=False) -> str:
+    """Return an SVG group for a node (rounded card + icon + label)."""
+    n = nodes[key]
+    rx = 12
+    border = "#2563eb" if highlight else "#cbd5e1"
+    stroke_w = 2 if highlight else 1
+    img_tag = (
+        f'<image href="{icon_uri}" x="{(NODE_W-ICON_SIZE)/2}" y="12" width="{ICON_SIZE}" height="{ICON_SIZE}"/>'
+        if icon_uri else ""
+    )
+    return f'''
+    <g transform="translate({n["x"]},{n["y"]})">
+      <rect width="{NODE_W}" height="{NODE_H}" rx="{rx}" ry="{rx}"
+            fill="#f8fafc" stroke="{border}" stroke-width="{stroke_w}"/>
+      {img_tag}
+      <text x="{NODE_W/2}" y="{ICON_SIZE+36}" text-anchor="middle"
+            font-family="Inter, system-ui, -apple-system, Segoe UI, Roboto, sans-serif"
+            font-size="12" font-weight="600" fill="#0f172a">{title}</text>
+    </g>
+    '''
+
+
+def edge_line(a: str, b: str, label: str, style: str) -> str:
+    """Return an SVG line with arrowheads and an optional mid-label."""
+    A, B = nodes[a], nodes[b]
+    stroke = "#475569" if style.startswith("solid") else "#64748b"
+    dash = 'stroke-dasharray="6,5"' if style.startswith("dashed") else ""
+    # Arrowheads
+    marker_end = 'marker-end="url(#arrow)"' if style.startswith("solid") else 'marker-end="url(#arrow-dashed)"'
+    marker_start = marker_end if "bidir" in style else ""
+    # Midpoint label
+    mx, my = (A["cx"] + B["cx"]) / 2, (A["cy"] + B["cy"]) / 2 - 10
+    label_el = (
+        f'<text x="{mx}" y="{my}" font-size="11" text-anchor="middle" fill="#475569">{label}</text>'
+        if label else ""
+    )
+    return f'''
+      <line x1="{A["cx"]}" y1="{A["cy"]}" x2="{B["cx"]}" y2="{B["cy"]}"
+            stroke="{stroke}" stroke-width="1.5" {dash} {marker_start} {marker_end} />
+      {label_el}
+    '''
+
+
+def build_icons_html(icons: Dict[str, str], compliance_label: str = "HIPAA / GDPR") -> str:
+    """Return the full HTML (CSS + SVG) for the icons diagram; `icons` maps ICON_NAMES to data URIs."""
+    icons = {n: icons.get(n, "") for n in ICON_NAMES}
+    compliance_label = html_escape(compliance_label)
+    svg_edges = "\n".join(edge_line(*e) for e in edges)
+
+    # Compliance rectangle (inside the SVG coordinate system)
+    comp_x, comp_y, comp_w, comp_h = 300, 60, 820, 520
+
+    # Responsive CSS + SVG:
+    # - Wrapper uses width:100% and aspect-ratio to preserve proportions.
+    # - SVG uses viewBox and scales to fill the wrapper.
+    html = f"""
+    <style>
+      .svg-wrap {{
+        position: relative;
+        width: 100%;
+        aspect-ratio: {VW} / {VH};
+        background: #ffffff;
+        border: 1px solid #e5e7eb;
+        border-radius: 12px;
+        box-shadow: 0 1px 2px rgba(0,0,0,0.06);
+      }}
+      .svg-wrap > svg {{
+        width: 100%;
+        height: 100%;
+        display: block;
+      }}
+      .badge {{
+        position: absolute;
+        left: {comp_x + 12}px;
+        top: {comp_y - 24}px;
+        font: 600 12px/1 'Inter', system-ui, -apple-system, Segoe UI, Roboto, sans-serif;
+        color:#dc2626; background:#fff; padding:4px 8px; border:1px solid #fecaca; border-radius:8px;
+        pointer-events: none;
+      }}
+    </style>
+
+    <div class="svg-wrap">
+      <svg viewBox="0 0 {VW} {VH}" preserveAspectRatio="xMidYMid meet" xmlns="http://www.w3.org/2000/svg">
+        <defs>
+          <marker id="arrow" markerWidth="10" markerHeight="10" refX="10" refY="5" orient="auto">
+            <path d="M0,0 L10,5 L0,10 z" fill="#475569"/>
+          </marker>
+          <marker id="arrow-dashed" markerWidth="10" markerHeight="10" refX="10" refY="5" orient="auto">
+            <path d="M0,0 L10,5 L0,10 z" fill="#64748b"/>
+          </marker>
+        </defs>
+
+        <!-- Compliance boundary rectangle -->
+        <rect x="{comp_x}" y="{comp_y}" width="{comp_w}" height="{comp_h}" rx="14" ry="14"
+              fill="none" stroke="#ef4444" stroke-width="2"/>
+
+        <!-- Edges -->
+        {svg_edges}
+
+        <!-- Nodes -->
+        {node_g("patient","Patient", icons["patient"])}
+        {node_g("clinician","Healthcare Professional", icons["clinician"])}
+        {node_g("insurer","Insurance Company", icons["insurer"])}
+
+        {node_g("profile","Agent Profile", icons["agent_profile"], highlight=True)}
+        {node_g("orchestrator","Agent (Orchestrator & Planner)", icons["orchestrator"])}
+        {node_g("llm","LLM", icons["llm"])}
+        {node_g("system","System message / policies", icons["system"])}
+        {node_g("langchain","LangChain", icons["langchain"])}
+        {node_g("langgraph","LangGraph", icons["langgraph"])}
+        {node_g("memory","Memory store", icons["memory"])}
+        {node_g("knowledge","Knowledge base", icons["knowledge"])}
+        {node_g("tools","Specialized Tools", icons["tools"])}
+
+        {node_g("mcp","MCP (Model Context Protocol)", icons["mcp"])}
+      </svg>
+
+      <div class="badge">Compliance Boundary: {compliance_label}</div>
+    </div>
+    """
+    return html
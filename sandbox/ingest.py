@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Attachment ingestion for the checklist: which required attachments are
+actually in the files the clinician uploaded ("Attachment completeness").
+
+Pipeline:
+1. Hash. Each file is hashed (SHA-256, streamed in 1 MiB blocks). Text
+   already extracted for that hash is reused from the cache directory.
+2. Extract. PDFs are split into page ranges (`pages_per_task`), and each
+   range is extracted page by page in a worker process (pymupdf, else
+   pypdf). HTML is one task (trafilatura, else BeautifulSoup), split into
+   pages at h1/h2 headings. Workers write text straight to part files, and
+   at most `max_inflight` tasks are queued. Memory therefore stays bounded
+   by one page per worker, whatever the document size.
+3. Cache. Parts are concatenated into `<sha256>.txt.gz` (pages separated by
+   form feeds) plus `<sha256>.json` metadata. This is extracted clinical
+   text, kept in plaintext: entries unused for `INGEST_CACHE_TTL_HOURS` are
+   deleted, and the oldest go first once the directory exceeds
+   `INGEST_CACHE_MAX_MB` (see `AttachmentIngestor.prune`).
+4. Detect. The cached text is streamed page by page through the detectors
+   for the required attachment labels. Each label has groups of alternative
+   patterns, and every group must match somewhere in the document (e.g.
+   "clinical report" and "signed" for a signed report). Labels without a
+   built-in detector match their own wording. A signed PDF signature field
+   counts as "signed" on the page that holds it.
+
+The Playground runs `submit_check()`, which does all of the above on a job
+thread while the page renders, and waits for it behind a spinner.
+
+`AttachmentReport.completeness` is present / required. Labels marked
+"(if applicable)" are optional and do not count as missing.
+
+CLI (from the sandbox directory):
+    python ingest.py --sample-pages 400 --workers 2       # synthetic 400-page PDF, cold then cached
+    python ingest.py order.pdf report.pdf --insurer SaludPlus --trigger "outpatient surgery"
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CACHE_DIR = Path(os.environ.get("INGEST_CACHE_DIR", Path(__file__).resolve().parent / ".ingest_cache"))
+CACHE_TTL_S = float(os.environ.get("INGEST_CACHE_TTL_HOURS", "24")) * 3600
+CACHE_MAX_BYTES = int(float(os.environ.get("INGEST_CACHE_MAX_MB", "512")) * 2**20)
+CACHE_VERSION = 3   # bump when extraction output changes; older entries are re-extracted
+PDF_EXT = {".pdf"}
+HTML_EXT = {".html", ".htm", ".xhtml"}
+TEXT_EXT = {".txt", ".md"}
+PAGE_BREAK = "\f"
+
+# Detectors for the attachment labels used by the checklist (step-4 defaults and
+# tenant examples): label (lowercase) → groups; each group is a list of
+# alternative patterns and every group must match somewhere in the document.
+ATTACHMENT_PATTERNS: Dict[str, List[List[str]]] = {
+    "medical order / discharge summary": [[r"medical order", r"discharge summary", r"orden m[eé]dica",
+                                           r"epicrisis", r"alta (m[eé]dica|hospitalaria)"]],
+    "signed clinical report (pdf)": [[r"clinical report", r"medical report", r"informe (m[eé]dico|cl[ií]nico)"],
+                                     [r"\bsigned\b", r"signature", r"\bfirma(do)?\b", r"/s/"]],
+    "supporting tests (if applicable)": [[r"laboratory", r"lab results", r"\bx-ray\b", r"\bmri\b", r"ultrasound",
+                                          r"radiograf[ií]a", r"resonancia", r"ex[aá]men(es)?", r"test results"]],
+    "insurer-specific certificates/templates": [[r"certificate", r"certificado", r"claim form", r"formulario"]],
+    "operative report": [[r"operative report", r"surgical report", r"protocolo operatorio", r"informe quir[uú]rgico"]],
+    "anesthesia record": [[r"anesthesia record", r"anaesthesia", r"registro anest[eé]sico"]],
+    "admission and discharge dates": [[r"admission date", r"date of admission", r"fecha de ingreso"],
+                                      [r"discharge date", r"date of discharge", r"fecha de (egreso|alta)"]],
+    "work incapacity certificate": [[r"incapacity", r"sick leave", r"licencia m[eé]dica", r"incapacidad"]],
+    "treatment plan and session log": [[r"treatment plan", r"plan de tratamiento"],
+                                       [r"session", r"sesi[oó]n"]],
+    "patient consent form": [[r"consent", r"consentimiento"]],
+}
+
+
+# -----------------------------
+# Records
+# -----------------------------
+@dataclass
+class DocumentResult:
+    path: str
+    sha256: str
+    kind: str                          # 'pdf' | 'html' | 'text'
+    pages: int
+    chars: int
+    signature_fields: int = 0          # signed PDF signature fields (blank ones are not counted)
+    signature_pages: List[int] = field(default_factory=list)  # 1-based pages holding those fields
+    detected: Dict[str, int] = field(default_factory=dict)   # label → first page (1-based) where it completed
+    cached: bool = False
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class AttachmentReport:
+    required: List[str]
+    present: List[str]
+    missing: List[str]
+    optional_missing: List[str]
+    documents: List[DocumentResult]
+
+    @property
+    def completeness(self) -> float:
+        """Share of required (non-optional) attachments found, 0..1 (1.0 when nothing is required)."""
+        counted = [r for r in self.required if not _optional(r)]
+        found = [r for r in counted if r in self.present]
+        return len(found) / len(counted) if counted else 1.0
+
+    def kpi_counts(self) -> Tuple[int, int]:
+        """(attachments_present, attachments_required) for a 'submitted' KPI event."""
+        counted = [r for r in self.required if not _optional(r)]
+        return sum(r in self.present for r in counted), len(counted)
+
+
+def _optional(label: str) -> bool:
+    return "(if applicable)" in label.lower()
+
+
+# -----------------------------
+# Detection
+# -----------------------------
+def _label_groups(label: str) -> List[List[str]]:
+    """Built-in groups for a label, else its own wording ('A / B' → either phrase)."""
+    groups = ATTACHMENT_PATTERNS.get(label.strip().lower())
+    if groups is not None:
+        return groups
+    core = re.sub(r"\(.*?\)", "", label).lower()
+    alternatives = [re.escape(" ".join(p.split())) for p in re.split(r"/| or ", core) if p.strip()]
+    return [alternatives or [re.escape(label.lower())]]
+
+
+class Detector:
+    """Compiled detectors for a set of labels; `feed()` one page at a time, then `result()`."""
+
+    def __init__(self, labels: Sequence[str]):
+        self.labels = list(dict.fromkeys(labels))
+        self._groups = {lb: [re.compile("|".join(f"(?:{p})" for p in g), re.IGNORECASE) for g in _label_groups(lb)]
+                        for lb in self.labels}
+        self._seen: Dict[str, List[bool]] = {lb: [False] * len(g) for lb, g in self._groups.items()}
+        self._found: Dict[str, int] = {}
+
+    def feed(self, page_no: int, text: str) -> None:
+        for label, groups in self._groups.items():
+            if label in self._found:
+                continue
+            seen = self._seen[label]
+            for i, rx in enumerate(groups):
+                if not seen[i] and rx.search(text):
+                    seen[i] = True
+            if all(seen):
+                self._found[label] = page_no
+
+    def result(self) -> Dict[str, int]:
+        return dict(self._found)
+
+
+# -----------------------------
+# Worker functions (module level: run in the process pool)
+# -----------------------------
+def _extract_pdf_range(path: str, start: int, stop: int, part: str) -> Tuple[int, int, List[int]]:
+    """
+    Extract pages [start, stop) into `part`, one page in memory at a time;
+    returns (pages, chars, 1-based page of each signed signature field).
+    """
+    chars = 0
+    sigs: List[int] = []
+    with open(part, "w", encoding="utf-8") as out:
+        try:
+            import pymupdf
+        except ImportError:
+            from pypdf import PdfReader
+            reader = PdfReader(path)
+            for i in range(start, stop):
+                text = reader.pages[i].extract_text() or ""
+                out.write(text.replace(PAGE_BREAK, " ") + PAGE_BREAK)
+                chars += len(text)
+            return stop - start, chars, []
+        with pymupdf.open(path) as doc:
+            for i in range(start, stop):
+                page = doc.load_page(i)
+                text = page.get_text("text")
+                out.write(text.replace(PAGE_BREAK, " ") + PAGE_BREAK)
+                chars += len(text)
+                sigs += [i + 1 for w in page.widgets() if w.field_type == pymupdf.PDF_WIDGET_TYPE_SIGNATURE
+                         and _signed(doc, w)]
+                del page
+        pymupdf.TOOLS.store_shrink(100)  # drop this worker's object/glyph cache between ranges
+    return stop - start, chars, sigs
+
+
+def _signed(doc: Any, widget: Any) -> bool:
+    """A signature field counts only once it holds a signature value (/V); an empty box does not."""
+    kind, _ = doc.xref_get_key(widget.xref, "V")
+    return kind not in ("null", "")
+
+
+def _extract_html(path: str, part: str) -> Tuple[int, int, List[int]]:
+    """HTML main text, split into pages at h1/h2 headings."""
+    raw = Path(path).read_text(encoding="utf-8", errors="replace")
+    try:
+        import trafilatura
+        text = trafilatura.extract(raw, include_tables=True, output_format="markdown") or ""
+        pages = re.split(r"\n(?=#{1,2} )", text)
+    except ImportError:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(raw, "html.parser")
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        pages, current = [], []
+        for el in soup.find_all(["h1", "h2", "h3", "h4", "p", "li", "td", "th", "pre"]):
+            if el.name in ("h1", "h2") and current:
+                pages.append("\n".join(current))
+                current = []
+            if el.find(["p", "li", "td", "th"]) is None:
+                current.append(el.get_text(" ", strip=True))
+        pages.append("\n".join(current))
+    pages = [p for p in pages if p.strip()] or [""]
+    with open(part, "w", encoding="utf-8") as out:
+        for p in pages:
+            out.write(p.replace(PAGE_BREAK, " ") + PAGE_BREAK)
+    return len(pages), sum(len(p) for p in pages), []
+
+
+def _copy_text(path: str, part: str) -> Tuple[int, int, List[int]]:
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    pages = text.split(PAGE_BREAK)
+    with open(part, "w", encoding="utf-8") as out:
+        for p in pages:
+            out.write(p + PAGE_BREAK)
+    return len(pages), len(text), []
+
+
+def _pdf_page_count(path: str) -> int:
+    try:
+        import pymupdf
+        with pymupdf.open(path) as doc:
+            return doc.page_count
+    except ImportError:
+        from pypdf import PdfReader
+        return len(PdfReader(path).pages)
+
+
+# -----------------------------
+# Ingestor
+# -----------------------------
+def file_hash(path: Path, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(block):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _kind(path: Path) -> str:
+    ext = path.suffix.lower()
+    if ext in PDF_EXT:
+        return "pdf"
+    if ext in HTML_EXT:
+        return "html"
+    if ext in TEXT_EXT:
+        return "text"
+    raise ValueError(f"Unsupported attachment type: {path.name}")
+
+
+class AttachmentIngestor:
+    """
+    Shared ingestion service (process pool + on-disk text cache). Safe to
+    share across sessions; `submit_check()` runs a whole check on a job
+    thread so the caller's script thread is free while files are read.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_workers: Optional[int] = None, pages_per_task: int = 16,
+                 max_inflight: Optional[int] = None, ttl: float = CACHE_TTL_S, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.pages_per_task = pages_per_task
+        self.max_inflight = max_inflight or 2 * self.max_workers
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.prune()
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool.submit(fn, *args)
+
+    def submit_check(self, paths: Sequence[Path], required: Sequence[str]) -> Future:
+        """`check()` on a job thread; returns a Future[AttachmentReport]."""
+        with self._lock:
+            if self._jobs is None:
+                self._jobs = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest")
+            return self._jobs.submit(self.check, list(paths), list(required))
+
+    def close(self, wait: bool = False) -> None:
+        """
+        Release the worker pool and job threads. Tasks already submitted still
+        finish, and the ingestor stays usable: an extraction running in another
+        session (e.g. when the tenant is evicted mid-run) submits its remaining
+        tasks to a fresh pool.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+            jobs, self._jobs = self._jobs, None
+        for ex in (jobs, pool):
+            if ex is not None:
+                ex.shutdown(wait=wait)
+
+    # --- cache ---
+    def _text_path(self, sha: str) -> Path:
+        return self.cache_dir / f"{sha}.txt.gz"
+
+    def _meta_path(self, sha: str) -> Path:
+        return self.cache_dir / f"{sha}.json"
+
+    def cached(self, sha: str) -> Optional[Dict[str, Any]]:
+        """Metadata of a cached document (and marks it as used), or None if absent, stale or unreadable."""
+        text = self._text_path(sha)
+        try:
+            meta = json.loads(self._meta_path(sha).read_text(encoding="utf-8"))
+            if meta.get("version") != CACHE_VERSION:
+                return None
+            os.utime(text)  # last use, for TTL / size eviction
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    def _write_meta(self, sha: str, meta: Dict[str, Any]) -> None:
+        tmp = self._meta_path(sha).with_name(f"{sha}.json.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self._meta_path(sha))  # readers never see a partial file
+
+    def prune(self, now: Optional[float] = None, min_age: float = 60.0) -> int:
+        """
+        Enforce retention: delete entries not used for `ttl` seconds, then the
+        least recently used ones while the cache exceeds `max_bytes` (entries
+        used in the last `min_age` seconds are kept). Returns entries removed.
+        """
+        now = time.time() if now is None else now
+        self._last_prune = now
+        entries = []
+        for text in self.cache_dir.glob("*.txt.gz"):
+            sha = text.name[:-len(".txt.gz")]
+            try:
+                st = text.stat()
+                size = st.st_size + self._meta_path(sha).stat().st_size
+            except OSError:
+                continue
+            entries.append((st.st_mtime, size, sha))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for used, size, sha in entries:
+            expired = self.ttl > 0 and now - used > self.ttl
+            if not expired and (not self.max_bytes or total <= self.max_bytes or now - used < min_age):
+                continue
+            for path in (self._meta_path(sha), self._text_path(sha)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
+
+    def iter_pages(self, sha: str) -> Iterator[str]:
+        """Cached text of a document, one page at a time (streamed from the gzip file)."""
+        buf = ""
+        with gzip.open(self._text_path(sha), "rt", encoding="utf-8") as f:
+            while block := f.read(1 << 16):
+                buf += block
+                *pages, buf = buf.split(PAGE_BREAK)
+                yield from pages
+        if buf:
+            yield buf
+
+    # --- extraction ---
+    def extract(self, paths: Sequence[Path]) -> List[Tuple[Path, str, Dict[str, Any], bool, Optional[str]]]:
+        """
+        Make sure every file's text is in the cache. Returns (path, sha256,
+        metadata, was_cached, error) per input. Page-range tasks from all files
+        share the pool, at most `max_inflight` queued at a time.
+        """
+        out: List[Tuple[Path, str, Dict[str, Any], bool, Optional[str]]] = []
+        jobs: List[Tuple[int, Path, str, str, List[Tuple]]] = []   # (slot, path, sha, kind, tasks)
+        for p in map(Path, paths):
+            try:
+                kind = _kind(p)
+                sha = file_hash(p)
+            except (OSError, ValueError) as e:
+                out.append((p, "", {}, False, f"{type(e).__name__}: {e}"))
+                continue
+            meta = self.cached(sha)
+            out.append((p, sha, meta or {}, meta is not None, None))
+            if meta is None and not any(j[2] == sha for j in jobs):
+                jobs.append((len(out) - 1, p, sha, kind, []))
+        if not jobs:
+            return out
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        work = Path(tempfile.mkdtemp(prefix="ingest-", dir=self.cache_dir))
+        try:
+            tasks: List[Tuple[Tuple, str, int]] = []   # ((fn, args...), part path, job index)
+            for j, (slot, p, sha, kind, parts) in enumerate(jobs):
+                try:
+                    if kind == "pdf":
+                        n = _pdf_page_count(str(p))
+                        ranges = [(s, min(n, s + self.pages_per_task)) for s in range(0, n, self.pages_per_task)] or [(0, 0)]
+                        for k, (a, b) in enumerate(ranges):
+                            part = str(work / f"{sha}.{k:05d}")
+                            parts.append(part)
+                            tasks.append(((_extract_pdf_range, str(p), a, b, part), part, j))
+                    else:
+                        part = str(work / f"{sha}.00000")
+                        parts.append(part)
+                        fn = _extract_html if kind == "html" else _copy_text
+                        tasks.append(((fn, str(p), part), part, j))
+                except Exception as e:
+                    out[slot] = (p, sha, {}, False, f"{type(e).__name__}: {e}")
+                    parts.clear()
+
+            totals: List[List[Any]] = [[0, 0, []] for _ in jobs]
+            failed: Dict[int, str] = {}
+            pending: Dict[Future, int] = {}
+            queue = iter(tasks)
+            while True:
+                while len(pending) < self.max_inflight:
+                    nxt = next(queue, None)
+                    if nxt is None:
+                        break
+                    (fn, *args), _, j = nxt
+                    if j not in failed:
+                        pending[self._submit(fn, *args)] = j
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    j = pending.pop(fut)
+                    try:
+                        pages, chars, sigs = fut.result()
+                        totals[j][0] += pages
+                        totals[j][1] += chars
+                        totals[j][2] += sigs
+                    except Exception as e:
+                        failed[j] = f"{type(e).__name__}: {e}"
+
+            for j, (slot, p, sha, kind, parts) in enumerate(jobs):
+                if not parts:
+                    continue
+                if j in failed:
+                    out[slot] = (p, sha, {}, False, failed[j])
+                    continue
+                meta = {"version": CACHE_VERSION, "kind": kind, "pages": totals[j][0], "chars": totals[j][1],
+                        "signature_fields": len(totals[j][2]), "signature_pages": sorted(totals[j][2]), "name": p.name}
+                tmp = work / f"{sha}.txt.gz"
+                with gzip.open(tmp, "wb", compresslevel=5) as gz:
+                    for part in parts:
+                        with open(part, "rb") as f:
+                            shutil.copyfileobj(f, gz, 1 << 20)
+                os.replace(tmp, self._text_path(sha))
+                self._write_meta(sha, meta)
+                out[slot] = (p, sha, meta, False, None)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+        if time.time() - self._last_prune > 60:
+            self.prune()
+        # Duplicate inputs (same hash) reuse the first one's metadata
+        by_sha = {sha: meta for _, sha, meta, _, err in out if sha and meta and not err}
+        return [(p, sha, by_sha.get(sha, meta), cached, err if not by_sha.get(sha) else None)
+                for p, sha, meta, cached, err in out]
+
+    # --- detection ---
+    def detect(self, sha: str, labels: Sequence[str], signature_pages: Sequence[int] = ()) -> Dict[str, int]:
+        detector = Detector(labels)
+        signed = set(signature_pages)
+        for i, page in enumerate(self.iter_pages(sha), start=1):
+            if i in signed:
+                page += "\nsigned"  # a signed PDF signature field counts as a signature on its own page
+            detector.feed(i, page)
+            if len(detector.result()) == len(detector.labels):
+                break
+        return detector.result()
+
+    def check(self, paths: Sequence[Path], required: Sequence[str]) -> AttachmentReport:
+        """Extract (or reuse) the files' text and report which required attachments they contain."""
+        docs: List[DocumentResult] = []
+        for p, sha, meta, cached, err in self.extract(paths):
+            t0 = time.perf_counter()
+            doc = DocumentResult(path=str(p), sha256=sha, kind=meta.get("kind", ""), pages=meta.get("pages", 0),
+                                 chars=meta.get("chars", 0), signature_fields=meta.get("signature_fields", 0),
+                                 signature_pages=list(meta.get("signature_pages", [])), cached=cached, error=err)
+            if err is None:
+                doc.detected = self.detect(sha, required, doc.signature_pages)
+            doc.elapsed = time.perf_counter() - t0
+            docs.append(doc)
+        present = [r for r in required if any(r in d.detected for d in docs)]
+        missing = [r for r in required if r not in present]
+        return AttachmentReport(
+            required=list(required), present=present,
+            missing=[r for r in missing if not _optional(r)],
+            optional_missing=[r for r in missing if _optional(r)],
+            documents=docs,
+        )
+
+
+def save_uploads(files: Iterable[Any], directory: Path) -> List[Path]:
+    """Write uploaded files (objects with .name and .getbuffer(), e.g. Streamlit UploadedFile) by content hash."""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for f in files:
+        data = f.getbuffer()
+        sha = hashlib.sha256(data).hexdigest()
+        path = directory / f"{sha[:16]}{Path(f.name).suffix.lower()}"
+        if not path.exists():
+            tmp = path.with_name(f".{path.name}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        paths.append(path)
+    return paths
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def make_sample_pdf(path: Path, pages: int) -> Path:
+    """Synthetic multi-page case file: discharge summary, signed report, lab results, filler pages."""
+    import pymupdf
+    doc = pymupdf.open()
+    sections = {
+        0: "DISCHARGE SUMMARY\nAdmission date: 2025-09-01\nDischarge date: 2025-09-04",
+        1: "CLINICAL REPORT\nPatient with acute lumbosciatica.\nSigned: Dr. Example",
+        pages // 2: "LABORATORY RESULTS\nMRI lumbar spine: L5-S1 protrusion.",
+    }
+    filler = "Progress note: physiotherapy session, pain 3/10, mobility improving. " * 12
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(pymupdf.Rect(50, 50, 550, 800), sections.get(i, f"Page {i + 1}\n{filler}"), fontsize=9)
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def _peak_rss_mb() -> Dict[str, float]:
+    import resource
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / 2**20
+    return {"main": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale, 1),
+            "workers": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale, 1)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Ingest attachments and report checklist completeness.")
+    ap.add_argument("files", nargs="*", type=Path)
+    ap.add_argument("--tenant", default=None, help="tenant id (TENANTS_FILE); default: first tenant")
+    ap.add_argument("--insurer", default="")
+    ap.add_argument("--trigger", default="")
+    ap.add_argument("--required", action="append", default=[],
+                    help="required label (repeatable); default: the tenant's rules for --insurer/--trigger")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--pages-per-task", type=int, default=16)
+    ap.add_argument("--cache-dir", type=Path, default=None)
+    ap.add_argument("--sample-pages", type=int, default=0, help="generate a synthetic PDF with this many pages")
+    args = ap.parse_args(argv)
+
+    if args.required:
+        required = args.required
+    else:
+        from knowledge_graph import PayerKnowledgeGraph
+        from tenants import load_tenants
+        tenants = load_tenants()
+        tenant = tenants[args.tenant] if args.tenant else next(iter(tenants.values()))
+        kg = PayerKnowledgeGraph.from_tenant(tenant, [tenant.knowledge_graph] if tenant.knowledge_graph else [])
+        required = kg.required_attachments(args.insurer, args.trigger)
+    tmp = Path(tempfile.mkdtemp(prefix="ingest-demo-"))
+    files = list(args.files)
+    if args.sample_pages:
+        files.append(make_sample_pdf(tmp / f"case_{args.sample_pages}p.pdf", args.sample_pages))
+    if not files:
+        ap.error("no files (pass paths or --sample-pages N)")
+
+    ingestor = AttachmentIngestor(args.cache_dir or tmp / "cache", max_workers=args.workers,
+                                  pages_per_task=args.pages_per_task)
+    runs = {}
+    for label in ("cold", "cached"):
+        t0 = time.perf_counter()
+        report = ingestor.check(files, required)
+        runs[label] = round(time.perf_counter() - t0, 3)
+    ingestor.close(wait=True)  # reap the workers so their peak RSS is reported
+    print(json.dumps({
+        "seconds": runs,
+        "completeness_pct": round(100 * report.completeness, 1),
+        "present": report.present, "missing": report.missing, "optional_missing": report.optional_missing,
+        "documents": [{k: v for k, v in asdict(d).items() if k != "sha256"} for d in report.documents],
+        "peak_rss_mb": _peak_rss_mb(),
+    }, indent=2, ensure_ascii=False))
+    shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
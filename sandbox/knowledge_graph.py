@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Payer-rules knowledge graph (the architecture's "Knowledge base" node).
+
+Insurers offer plans, plans cover benefits, benefits are activated by
+triggers (medical acts, matched by keyword), and requirements say which
+attachments an owner (an insurer, or the tenant defaults) asks for, either
+always or for one trigger:
+
+    ins:saludplus  a pr:Insurer ; rdfs:label "SaludPlus" ; pr:offersPlan plan:saludplus-classic .
+    plan:saludplus-classic  a pr:Plan ; rdfs:label "Classic" ; pr:coversBenefit ben:outpatient-surgery .
+    ben:outpatient-surgery  a pr:Benefit ; rdfs:label "Outpatient surgery" ; pr:triggeredBy trg:surgery .
+    trg:surgery  a pr:Trigger ; rdfs:label "surgery" ; pr:keyword "surgery" .
+    [] a pr:Requirement ; pr:owner ins:saludplus ; pr:trigger trg:surgery ;
+       pr:attachment att:operative-report ; pr:position 0 .
+
+Resolution mirrors the tenant rules: an insurer's own base requirements
+replace the defaults, and its requirements for a trigger replace the default
+ones for that trigger.
+
+The graph lives in rdflib's Memory store, which keeps subject, predicate and
+object indexes, and is persisted as Turtle or N-Triples (`load` / `save`).
+Lookups run as SPARQL queries that are parsed and compiled once at import.
+Each query runs with its owner and trigger bound, so the evaluator does
+index lookups instead of scanning the graph. Results of
+`required_attachments(insurer, trigger)` and `rules_for(insurer)` are cached
+until the graph changes.
+
+CLI (from the sandbox directory):
+    python knowledge_graph.py --insurer SaludPlus --trigger "outpatient surgery"
+    python knowledge_graph.py --tenant acme-clinic --export kg.ttl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rdflib import RDF, RDFS, BNode, Graph, Literal, Namespace, URIRef
+from rdflib.plugins.sparql import prepareQuery
+
+PR = Namespace("urn:payer-rules:")
+DEFAULTS = PR["defaults"]          # owner of the tenant-wide rules
+_NS = {"pr": PR, "rdfs": RDFS}
+
+# -----------------------------
+# Prepared queries (parsed and translated to algebra once)
+# -----------------------------
+Q_BASE = prepareQuery("""
+    SELECT ?label WHERE {
+        ?req pr:owner ?owner ; pr:attachment ?a ; pr:position ?pos .
+        FILTER NOT EXISTS { ?req pr:trigger ?any }
+        ?a rdfs:label ?label .
+    } ORDER BY ?pos""", initNs=_NS)
+
+Q_FOR_TRIGGER = prepareQuery("""
+    SELECT ?label WHERE {
+        ?req pr:trigger ?trigger ; pr:owner ?owner ; pr:attachment ?a ; pr:position ?pos .
+        ?a rdfs:label ?label .
+    } ORDER BY ?pos""", initNs=_NS)
+
+Q_TRIGGER_KEYWORDS = prepareQuery("""
+    SELECT ?trigger ?kw WHERE { ?trigger a pr:Trigger ; pr:keyword ?kw . }""", initNs=_NS)
+
+Q_OWNER_TRIGGERS = prepareQuery("""
+    SELECT DISTINCT ?kw WHERE { ?req pr:owner ?owner ; pr:trigger ?trigger . ?trigger pr:keyword ?kw . }""", initNs=_NS)
+
+Q_INSURERS = prepareQuery("""
+    SELECT ?insurer ?label WHERE { ?insurer a pr:Insurer ; rdfs:label ?label . }""", initNs=_NS)
+
+Q_BENEFITS = prepareQuery("""
+    SELECT ?planLabel ?benefitLabel WHERE {
+        ?insurer pr:offersPlan ?plan .
+        ?plan rdfs:label ?planLabel ; pr:coversBenefit ?benefit .
+        ?benefit pr:triggeredBy ?trigger ; rdfs:label ?benefitLabel .
+    } ORDER BY ?planLabel ?benefitLabel""", initNs=_NS)
+
+
+def slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.strip().lower()).strip("-") or "x"
+
+
+def _fmt(path: Path) -> str:
+    return "nt" if path.suffix in (".nt", ".ntriples") else "turtle"
+
+
+class PayerKnowledgeGraph:
+    """Thread-safe wrapper around an rdflib Graph with cached checklist lookups."""
+
+    def __init__(self, graph: Optional[Graph] = None, cache_size: int = 1024):
+        self.graph = graph if graph is not None else Graph(store="Memory")
+        self.graph.bind("pr", PR)
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self._cache: "OrderedDict[Tuple[str, str], List[str]]" = OrderedDict()
+        self._rules: Dict[URIRef, Dict[str, Any]] = {}  # insurer node (or DEFAULTS) → rules_for() result
+        self._lock = threading.RLock()
+        self._index_fresh = False
+        self._insurers: Dict[str, URIRef] = {}          # lowercase label → node
+        self._keywords: List[Tuple[str, URIRef]] = []   # (keyword, trigger node)
+
+    # --- persistence ---
+    @classmethod
+    def load(cls, *paths: Path) -> "PayerKnowledgeGraph":
+        kg = cls()
+        for path in paths:
+            kg.graph.parse(str(path), format=_fmt(Path(path)))
+        return kg
+
+    def save(self, path: Path) -> Path:
+        """Write the graph atomically (Turtle, or N-Triples for .nt)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with self._lock:
+            self.graph.serialize(str(tmp), format=_fmt(path))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def from_tenant(cls, tenant: Any, extra: Iterable[Path] = ()) -> "PayerKnowledgeGraph":
+        """
+        Graph for a TenantConfig: step-4 defaults (or the tenant's lists) as the
+        default rules, insurer overrides as insurer rules, then any Turtle files
+        (plans, benefits, more rules).
+        """
+        from step4_tools import BASE_ATTACHMENTS, TRIGGER_ATTACHMENTS
+
+        kg = cls.load(*extra)
+        base = tenant.base_attachments if tenant.base_attachments is not None else BASE_ATTACHMENTS
+        triggers = tenant.trigger_attachments if tenant.trigger_attachments is not None else TRIGGER_ATTACHMENTS
+        kg.set_requirements(base)
+        for keyword, items in triggers.items():
+            kg.set_requirements(items, trigger=keyword)
+        for name, rules in tenant.insurers.items():
+            kg.add_insurer(name)
+            if "base_attachments" in rules:
+                kg.set_requirements(rules["base_attachments"], insurer=name)
+            for keyword, items in rules.get("trigger_attachments", {}).items():
+                kg.set_requirements(items, insurer=name, trigger=keyword)
+        return kg
+
+    # --- editing (invalidates the lookup cache) ---
+    def add_insurer(self, name: str) -> URIRef:
+        with self._lock:
+            node = self._insurer_node(name)
+            if node is None:
+                node = PR[f"insurer/{slug(name)}"]
+                self.graph.add((node, RDF.type, PR.Insurer))
+                self.graph.add((node, RDFS.label, Literal(name)))
+                self._changed()
+            return node
+
+    def add_trigger(self, keyword: str) -> URIRef:
+        keyword = keyword.strip().lower()
+        node = PR[f"trigger/{slug(keyword)}"]
+        with self._lock:
+            if (node, RDF.type, PR.Trigger) not in self.graph:
+                self.graph.add((node, RDF.type, PR.Trigger))
+                self.graph.add((node, RDFS.label, Literal(keyword)))
+                self.graph.add((node, PR.keyword, Literal(keyword)))
+                self._changed()
+        return node
+
+    def add_plan(self, insurer: str, plan: str, benefits: Dict[str, List[str]]) -> URIRef:
+        """A plan with its benefits (benefit label → trigger keywords that activate it)."""
+        with self._lock:
+            ins = self.add_insurer(insurer)
+            node = PR[f"plan/{slug(insurer)}/{slug(plan)}"]
+            self.graph.add((ins, PR.offersPlan, node))
+            self.graph.add((node, RDF.type, PR.Plan))
+            self.graph.add((node, RDFS.label, Literal(plan)))
+            for benefit, keywords in benefits.items():
+                ben = PR[f"benefit/{slug(benefit)}"]
+                self.graph.add((node, PR.coversBenefit, ben))
+                self.graph.add((ben, RDF.type, PR.Benefit))
+                self.graph.add((ben, RDFS.label, Literal(benefit)))
+                for kw in keywords:
+                    self.graph.add((ben, PR.triggeredBy, self.add_trigger(kw)))
+            self._changed()
+            return node
+
+    def set_requirements(self, attachments: List[str], insurer: Optional[str] = None,
+                         trigger: Optional[str] = None) -> None:
+        """Replace the attachments an owner (insurer, or the defaults) requires always / for one trigger."""
+        with self._lock:
+            owner = self.add_insurer(insurer) if insurer else DEFAULTS
+            trig = self.add_trigger(trigger) if trigger else None
+            for req in list(self.graph.subjects(PR.owner, owner)):
+                if self.graph.value(req, PR.trigger) == trig:
+                    self.graph.remove((req, None, None))
+            for pos, label in enumerate(attachments):
+                att = PR[f"attachment/{slug(label)}"]
+                self.graph.add((att, RDF.type, PR.Attachment))
+                self.graph.set((att, RDFS.label, Literal(label)))
+                req = BNode()
+                self.graph.add((req, RDF.type, PR.Requirement))
+                self.graph.add((req, PR.owner, owner))
+                self.graph.add((req, PR.attachment, att))
+                self.graph.add((req, PR.position, Literal(pos)))
+                if trig is not None:
+                    self.graph.add((req, PR.trigger, trig))
+            self._changed()
+
+    def _changed(self) -> None:
+        self._cache.clear()
+        self._rules.clear()
+        self._index_fresh = False
+
+    # --- lookups ---
+    def _refresh_index(self) -> None:
+        if self._index_fresh:
+            return
+        self._insurers = {str(r.label).strip().lower(): r.insurer for r in self.graph.query(Q_INSURERS)}
+        self._keywords = sorted(((str(r.kw).lower(), r.trigger) for r in self.graph.query(Q_TRIGGER_KEYWORDS)),
+                                key=lambda kt: kt[0])
+        self._index_fresh = True
+
+    def _insurer_node(self, name: str) -> Optional[URIRef]:
+        self._refresh_index()
+        return self._insurers.get(name.strip().lower())
+
+    def _labels(self, query: Any, **bindings: Any) -> List[str]:
+        return [str(r.label) for r in self.graph.query(query, initBindings=bindings)]
+
+    def matched_triggers(self, trigger: str) -> List[Tuple[str, URIRef]]:
+        """Trigger keywords found in a medical-act description, in order of appearance."""
+        text = trigger.lower()
+        with self._lock:
+            self._refresh_index()
+            hits = [(text.find(kw), kw, node) for kw, node in self._keywords if kw and kw in text]
+        return [(kw, node) for _, kw, node in sorted(hits, key=lambda h: h[0])]
+
+    def required_attachments(self, insurer: str, trigger: str) -> List[str]:
+        """Checklist attachments for an insurer and medical act (cached until the graph changes)."""
+        key = (insurer.strip().lower(), " ".join(trigger.lower().split()))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+            ins = self._insurer_node(insurer)
+            owners = [ins, DEFAULTS] if ins is not None else [DEFAULTS]
+            out = next((labels for owner in owners if (labels := self._labels(Q_BASE, owner=owner))), [])
+            for _, trig in self.matched_triggers(trigger):
+                out += next((labels for owner in owners
+                             if (labels := self._labels(Q_FOR_TRIGGER, owner=owner, trigger=trig))), [])
+            out = list(dict.fromkeys(out))
+            self._cache[key] = out
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return list(out)
+
+    def rules_for(self, insurer: str) -> Dict[str, Any]:
+        """
+        The resolved rules for an insurer, in the step-4 tool argument shape
+        (TenantConfig.rules_for). Memoized per insurer node, so unknown names
+        (free text from the form) all share the defaults entry; callers get a copy.
+        """
+        with self._lock:
+            ins = self._insurer_node(insurer)
+            key = ins if ins is not None else DEFAULTS
+            if key not in self._rules:
+                self._rules[key] = self._resolve_rules(ins)
+            rules = self._rules[key]
+            return {"base_attachments": list(rules["base_attachments"]),
+                    "trigger_attachments": {kw: list(v) for kw, v in rules["trigger_attachments"].items()}}
+
+    def _resolve_rules(self, ins: Optional[URIRef]) -> Dict[str, Any]:
+        owners = [ins, DEFAULTS] if ins is not None else [DEFAULTS]
+        base = next((labels for owner in owners if (labels := self._labels(Q_BASE, owner=owner))), [])
+        keywords = {str(r.kw) for owner in owners for r in self.graph.query(Q_OWNER_TRIGGERS, initBindings={"owner": owner})}
+        triggers = {}
+        for kw, trig in self._keywords:
+            if kw in keywords:
+                triggers[kw] = next((labels for owner in owners
+                                     if (labels := self._labels(Q_FOR_TRIGGER, owner=owner, trigger=trig))), [])
+        return {"base_attachments": base, "trigger_attachments": triggers}
+
+    def benefits_for(self, insurer: str, trigger: str) -> List[Dict[str, str]]:
+        """Plans/benefits of the insurer activated by the medical act."""
+        with self._lock:
+            ins = self._insurer_node(insurer)
+            if ins is None:
+                return []
+            out = []
+            for _, trig in self.matched_triggers(trigger):
+                out += [{"plan": str(r.planLabel), "benefit": str(r.benefitLabel)}
+                        for r in self.graph.query(Q_BENEFITS, initBindings={"insurer": ins, "trigger": trig})]
+        return [dict(t) for t in dict.fromkeys(tuple(d.items()) for d in out)]
+
+    def insurers(self) -> List[str]:
+        with self._lock:
+            return sorted(str(r.label) for r in self.graph.query(Q_INSURERS))
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "triples": len(self.graph)}
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Query the payer-rules knowledge graph of a tenant.")
+    ap.add_argument("--tenant", default=None, help="tenant id (TENANTS_FILE); default: first tenant")
+    ap.add_argument("--load", type=Path, action="append", default=[], help="extra Turtle/N-Triples file(s)")
+    ap.add_argument("--insurer", default="SaludPlus")
+    ap.add_argument("--trigger", default="outpatient surgery")
+    ap.add_argument("--repeat", type=int, default=200, help="lookups to time")
+    ap.add_argument("--export", type=Path, help="write the graph here (.ttl or .nt)")
+    args = ap.parse_args(argv)
+
+    from tenants import load_tenants
+    tenants = load_tenants()
+    tenant = tenants[args.tenant] if args.tenant else next(iter(tenants.values()))
+    extra = ([tenant.knowledge_graph] if tenant.knowledge_graph else []) + args.load
+    kg = PayerKnowledgeGraph.from_tenant(tenant, extra)
+
+    def timed(fn) -> float:
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        return round(1e6 * (time.perf_counter() - t0) / args.repeat, 1)
+
+    def uncached():
+        kg._cache.clear()
+        return kg.required_attachments(args.insurer, args.trigger)
+
+    report = {
+        "tenant": tenant.tenant_id,
+        "insurers": kg.insurers(),
+        "required_attachments": kg.required_attachments(args.insurer, args.trigger),
+        "benefits": kg.benefits_for(args.insurer, args.trigger),
+        "us_per_lookup": {"prepared": timed(uncached),
+                          "cached": timed(lambda: kg.required_attachments(args.insurer, args.trigger))},
+        "cache": kg.cache_info(),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.export:
+        print(f"graph → {kg.save(args.export)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
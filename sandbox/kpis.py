@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KPI analytics for the "KPIs (suggested)" block: first-pass approval rate,
+minutes per report, rejection rate and top reasons, cycle time and attachment
+completeness.
+
+Events are ingested in columnar batches (pandas) and folded into additive
+rollups keyed by (day, insurer, clinician). Dashboards query the rollups,
+which stay small (days × insurers × clinicians), so they never rescan raw
+events. Ingestion is idempotent: each event's fingerprint (a 64-bit hash of
+all its columns) is remembered, and events already counted are skipped, so
+re-uploading a file (from any session) does not double-count.
+
+Event columns:
+    ts, case_id, event ('requested' | 'drafted' | 'submitted' | 'approved' | 'rejected'),
+    insurer, clinician, minutes (drafted), reason (rejected),
+    attachments_present / attachments_required (submitted)
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+KEYS = ["day", "insurer", "clinician"]
+ROLLUP_COLS = [
+    "n_requested", "n_drafted", "minutes_sum", "n_decisions", "n_rejected", "n_first_decisions",
+    "n_first_pass", "n_cycle", "cycle_days_sum", "att_present", "att_required",
+]
+# Columns every event must carry; the others default when missing
+REQUIRED_COLS = ["ts", "case_id", "event"]
+# Columns that identify an event (after normalization) for de-duplication
+EVENT_COLS = ["ts", "case_id", "event", "insurer", "clinician", "minutes", "reason",
+              "attachments_present", "attachments_required"]
+
+
+def load_events(path: Path) -> pd.DataFrame:
+    """
+    Read events from CSV, JSON-lines or Parquet (by extension). Raises
+    ValueError when the file cannot be parsed or lacks a required column.
+    """
+    path = Path(path)
+    try:
+        if path.suffix == ".parquet":
+            events = pd.read_parquet(path)
+        elif path.suffix in (".jsonl", ".ndjson"):
+            events = pd.read_json(path, lines=True)
+        else:
+            events = pd.read_csv(path)
+    except ValueError:
+        raise
+    except Exception as e:  # parser errors differ by format and engine (pyarrow, csv, json)
+        raise ValueError(f"Could not read {path.name}: {e}") from e
+    _check_columns(events)
+    return events
+
+
+def _check_columns(events: pd.DataFrame) -> None:
+    missing = [c for c in REQUIRED_COLS if c not in events.columns]
+    if missing:
+        raise ValueError(f"Events are missing required column(s): {', '.join(missing)}")
+
+
+def _normalize(events: pd.DataFrame) -> pd.DataFrame:
+    _check_columns(events)
+    df = events.copy()
+    try:
+        df["ts"] = pd.to_datetime(df["ts"], utc=True)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid 'ts' values: {e}") from e
+    for col in ("insurer", "clinician", "reason"):
+        df[col] = df[col].fillna("(unknown)").astype(str) if col in df else "(unknown)"
+    for col in ("minutes", "attachments_present", "attachments_required"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0) if col in df else 0.0
+    df["case_id"] = df["case_id"].astype(str)
+    df["event"] = df["event"].astype(str).str.lower()
+    df["day"] = df["ts"].dt.floor("D")
+    return df.sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+class KPIEngine:
+    """
+    Incrementally maintained KPI rollups. `ingest()` is vectorized per batch;
+    `summary()` / `breakdown()` only touch the rollups. Decisions that arrive
+    before their case's 'requested' event are counted, but not in cycle time.
+    """
+
+    def __init__(self):
+        self._rollup = pd.DataFrame(columns=ROLLUP_COLS, dtype=float,
+                                    index=pd.MultiIndex.from_arrays([[], [], []], names=KEYS))
+        self._reasons = pd.Series(dtype=float, index=pd.MultiIndex.from_arrays([[], [], [], []],
+                                                                               names=KEYS + ["reason"]))
+        # Per-case state: first request time and whether a decision was already seen
+        self._cases = pd.DataFrame({"requested_ts": pd.Series(dtype="datetime64[ns, UTC]"),
+                                    "decided": pd.Series(dtype=bool)})
+        self._seen = np.empty(0, dtype=np.uint64)   # sorted fingerprints of ingested events
+        self._lock = threading.Lock()
+        self.events_ingested = 0
+        self.duplicates_skipped = 0
+
+    # -----------------------------
+    # Ingestion
+    # -----------------------------
+    def ingest(self, events: pd.DataFrame) -> int:
+        """
+        Fold a batch of events into the rollups; returns the number of new rows
+        ingested (events already ingested, or repeated within the batch, are skipped).
+        Raises ValueError, before any state changes, if the batch is malformed.
+        """
+        if events.empty:
+            return 0
+        df = _normalize(events)
+        keys = pd.util.hash_pandas_object(df[EVENT_COLS], index=False).to_numpy()
+
+        with self._lock:
+            fresh = ~np.isin(keys, self._seen) & ~pd.Series(keys).duplicated().to_numpy()
+            self.duplicates_skipped += int(len(df) - fresh.sum())
+            if not fresh.all():
+                df, keys = df.loc[fresh].reset_index(drop=True), keys[fresh]
+            if df.empty:
+                return 0
+            self._seen = np.union1d(self._seen, keys)
+            ev = df["event"].to_numpy()
+            is_req, is_draft, is_sub = ev == "requested", ev == "drafted", ev == "submitted"
+            is_appr, is_rej = ev == "approved", ev == "rejected"
+
+            # Case state: earliest request per case
+            req = df.loc[is_req].groupby("case_id")["ts"].min()
+            if not req.empty:
+                cur = self._cases["requested_ts"].reindex(req.index)
+                merged = cur.where(cur.notna() & (cur <= req), req)
+                self._cases = self._cases.reindex(self._cases.index.union(req.index))
+                self._cases.loc[req.index, "requested_ts"] = merged
+                self._cases["decided"] = self._cases["decided"].fillna(False).astype(bool)
+
+            # Decisions: first decision per case (across batches) drives first-pass yield
+            is_dec = is_appr | is_rej
+            dec = df.loc[is_dec, ["case_id", "event", "ts"]]
+            first = pd.Series(False, index=df.index)
+            cycle_days = pd.Series(np.nan, index=df.index)
+            if not dec.empty:
+                already = self._cases["decided"].reindex(dec["case_id"]).fillna(False).to_numpy(dtype=bool)
+                first_in_batch = (dec.groupby("case_id").cumcount() == 0).to_numpy()
+                first.loc[dec.index] = first_in_batch & ~already
+                appr = dec[dec["event"] == "approved"]
+                req_ts = self._cases["requested_ts"].reindex(appr["case_id"])
+                delta = appr["ts"].reset_index(drop=True) - req_ts.reset_index(drop=True)
+                cycle_days.loc[appr.index] = delta.dt.total_seconds().to_numpy() / 86400.0
+                decided_ids = dec["case_id"].unique()
+                self._cases = self._cases.reindex(self._cases.index.union(decided_ids))
+                self._cases.loc[decided_ids, "decided"] = True
+
+            contrib = pd.DataFrame({
+                "n_requested": is_req,
+                "n_drafted": is_draft,
+                "minutes_sum": np.where(is_draft, df["minutes"], 0.0),
+                "n_decisions": is_dec,
+                "n_rejected": is_rej,
+                "n_first_decisions": first.to_numpy(),
+                "n_first_pass": first.to_numpy() & is_appr,
+                "n_cycle": cycle_days.notna().to_numpy() & (cycle_days.to_numpy() >= 0),
+                "att_present": np.where(is_sub, df["attachments_present"], 0.0),
+                "att_required": np.where(is_sub, df["attachments_required"], 0.0),
+            }, index=df.index).astype(float)
+            contrib["cycle_days_sum"] = np.where(contrib["n_cycle"] > 0, cycle_days.fillna(0.0), 0.0)
+            for k in KEYS:
+                contrib[k] = df[k]
+
+            part = contrib.groupby(KEYS, sort=False)[ROLLUP_COLS].sum()
+            self._rollup = part if self._rollup.empty else self._rollup.add(part, fill_value=0.0)
+
+            rej = df.loc[is_rej]
+            if not rej.empty:
+                counts = rej.groupby(KEYS + ["reason"], sort=False).size().astype(float)
+                self._reasons = counts if self._reasons.empty else self._reasons.add(counts, fill_value=0.0)
+
+            self.events_ingested += len(df)
+        return len(df)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def _slice(self, frame, start=None, end=None, insurer=None, clinician=None):
+        if frame.empty:
+            return frame
+        idx = frame.index
+        mask = np.ones(len(frame), dtype=bool)
+        days = idx.get_level_values("day")
+        if start is not None:
+            mask &= days >= pd.Timestamp(start, tz="UTC")
+        if end is not None:
+            mask &= days <= pd.Timestamp(end, tz="UTC")
+        if insurer is not None:
+            mask &= idx.get_level_values("insurer") == insurer
+        if clinician is not None:
+            mask &= idx.get_level_values("clinician") == clinician
+        return frame[mask]
+
+    @staticmethod
+    def _kpis(t: pd.Series) -> Dict[str, Optional[float]]:
+        def ratio(a: str, b: str, scale: float = 1.0) -> Optional[float]:
+            return float(t[a] / t[b] * scale) if t.get(b, 0) else None
+        return {
+            "first_pass_approval_pct": ratio("n_first_pass", "n_first_decisions", 100.0),
+            "minutes_per_report": ratio("minutes_sum", "n_drafted"),
+            "rejection_rate_pct": ratio("n_rejected", "n_decisions", 100.0),
+            "cycle_time_days": ratio("cycle_days_sum", "n_cycle"),
+            "attachment_completeness_pct": ratio("att_present", "att_required", 100.0),
+            "reports": float(t.get("n_drafted", 0.0)),
+            "decisions": float(t.get("n_decisions", 0.0)),
+        }
+
+    def summary(self, *, start=None, end=None, insurer: Optional[str] = None,
+                clinician: Optional[str] = None) -> Dict[str, Optional[float]]:
+        with self._lock:
+            totals = self._slice(self._rollup, start, end, insurer, clinician).sum()
+        return self._kpis(totals.reindex(ROLLUP_COLS, fill_value=0.0))
+
+    def breakdown(self, by: str = "insurer", **filters: Any) -> pd.DataFrame:
+        """KPIs per 'day', 'insurer' or 'clinician' (one row per group)."""
+        with self._lock:
+            part = self._slice(self._rollup, **filters).groupby(level=by).sum()
+        return pd.DataFrame({g: self._kpis(row) for g, row in part.iterrows()}).T
+
+    def top_reasons(self, n: int = 5, **filters: Any) -> pd.Series:
+        with self._lock:
+            part = self._slice(self._reasons, **filters)
+            if part.empty:
+                return pd.Series(dtype=float, name="rejections")
+            return part.groupby(level="reason").sum().nlargest(n).rename("rejections")
+
+    def impact_inputs(self, **filters: Any) -> Dict[str, float]:
+        """Measured values for the Impact page inputs (reports/month, rejection %, minutes, delay)."""
+        with self._lock:
+            part = self._slice(self._rollup, **filters)
+            days = part.index.get_level_values("day")
+            span_days = max(1.0, (days.max() - days.min()).days + 1) if len(days) else 1.0
+            totals = part.sum().reindex(ROLLUP_COLS, fill_value=0.0)
+        k = self._kpis(totals)
+        out = {"reports_per_month": round(float(totals["n_drafted"]) * 30.0 / span_days)}
+        if k["rejection_rate_pct"] is not None:
+            out["reject_rate_pct"] = round(k["rejection_rate_pct"], 1)
+        if k["minutes_per_report"] is not None:
+            out["minutes_now"] = int(round(k["minutes_per_report"]))
+        if k["cycle_time_days"] is not None:
+            out["avg_delay_days"] = round(k["cycle_time_days"], 1)
+        return out
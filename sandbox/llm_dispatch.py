@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batching / coalescing dispatcher in front of LLM providers.
+
+- Single-flight: identical in-flight requests (same provider, prompt and
+  parameters) share one provider call and one Future.
+- Micro-batching: requests for a provider that accepts several prompts per
+  call (`max_batch > 1`) are collected for up to `window` seconds and sent
+  together; others are sent as they arrive, up to `concurrency` at a time.
+- Rate limits: each provider has a tokens-per-minute token bucket. Calls wait
+  for budget using an estimate (prompt tokens + max_tokens), and the bucket is
+  corrected with the provider's reported usage when available.
+
+Providers are small adapters: `CallableProvider` (any function, used for
+fakes or a real batch API), `LangChainProvider` (one ChatModel call per
+prompt, e.g. models from llmpop's init_llm) and `OllamaProvider`
+(/api/generate over a pooled httpx client, e.g. `OllamaSupervisor.client`).
+
+Demo (fake provider, no network):
+    python llm_dispatch.py --requests 200 --unique 8
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+# -----------------------------
+# Token accounting
+# -----------------------------
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken (cl100k_base) when installed, else ~4 characters per token."""
+    try:
+        import tiktoken
+    except ImportError:
+        return max(1, len(text) // 4)
+    return len(_encoding(tiktoken).encode(text))
+
+
+_ENCODING = None
+
+
+def _encoding(tiktoken):
+    global _ENCODING
+    if _ENCODING is None:
+        _ENCODING = tiktoken.get_encoding("cl100k_base")
+    return _ENCODING
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `tokens_per_minute / 60`
+    per second, holding at most `capacity` (default: one minute of budget).
+    """
+
+    def __init__(self, tokens_per_minute: float, capacity: Optional[float] = None):
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(tokens_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float, timeout: Optional[float] = None) -> float:
+        """
+        Block until `tokens` are available and take them; returns seconds waited.
+        Requests larger than the capacity wait for a full bucket. Raises
+        TimeoutError if `timeout` elapses first.
+        """
+        need = min(tokens, self.capacity)
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= need:
+                    self._tokens -= tokens
+                    return time.monotonic() - start
+                wait = (need - self._tokens) / self.rate
+                if timeout is not None:
+                    left = timeout - (time.monotonic() - start)
+                    if left <= 0:
+                        raise TimeoutError(f"token budget not available within {timeout:.1f}s")
+                    wait = min(wait, left)
+                self._cond.wait(wait)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (delta > 0) or refund (delta < 0) tokens after the fact; the balance may go negative."""
+        with self._cond:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - delta)
+            self._cond.notify_all()
+
+    @property
+    def available(self) -> float:
+        with self._cond:
+            self._refill()
+            return self._tokens
+
+
+# -----------------------------
+# Providers
+# -----------------------------
+@dataclass
+class Completion:
+    text: str
+    tokens: Optional[int] = None       # total tokens reported by the provider, if any
+
+
+class Provider:
+    """Adapter base class: `generate()` gets up to `max_batch` prompts sharing the same parameters."""
+
+    name: str = "provider"
+    max_batch: int = 1                         # > 1: several prompts per call
+    concurrency: int = 4                       # calls in flight at once
+    tokens_per_minute: Optional[int] = None    # None → no rate limit
+
+    def generate(self, prompts: List[str], **params: Any) -> List[Completion]:
+        raise NotImplementedError
+
+
+class CallableProvider(Provider):
+    """Wrap `fn(prompts, **params) -> list of str | Completion` (fakes, custom clients)."""
+
+    def __init__(self, name: str, fn: Callable[..., Sequence[Any]], *, max_batch: int = 1, concurrency: int = 4,
+                 tokens_per_minute: Optional[int] = None):
+        self.name, self.fn = name, fn
+        self.max_batch, self.concurrency, self.tokens_per_minute = max_batch, concurrency, tokens_per_minute
+
+    def generate(self, prompts: List[str], **params: Any) -> List[Completion]:
+        return [r if isinstance(r, Completion) else Completion(str(r)) for r in self.fn(prompts, **params)]
+
+
+class LangChainProvider(Provider):
+    """
+    A LangChain chat model, one `invoke()` per prompt (usage from usage_metadata).
+    `ChatModel.batch()` only fans out client-side, so this adapter keeps
+    `max_batch = 1` and relies on `concurrency` and single-flight instead.
+    `config` is the run config for every call (e.g. callbacks and
+    `metadata={"step": ...}` for telemetry, since calls run on lane threads).
+    Requests may carry their own `system` message and `callbacks`
+    (`dispatcher.submit(name, prompt, system=..., callbacks=[...])`); they
+    override the defaults and, being parameters, only coalesce with requests
+    that use the same ones.
+    """
+
+    def __init__(self, name: str, model: Any, *, concurrency: int = 2, tokens_per_minute: Optional[int] = None,
+                 system: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+        self.name, self.model, self.system, self.config = name, model, system, dict(config or {})
+        self.concurrency, self.tokens_per_minute = concurrency, tokens_per_minute
+
+    def generate(self, prompts: List[str], **params: Any) -> List[Completion]:
+        from langchain_core.messages import HumanMessage, SystemMessage
+        system = params.pop("system", self.system)
+        config = {**self.config, "callbacks": params.pop("callbacks")} if "callbacks" in params else self.config
+        model = self.model.bind(**params) if params else self.model
+        out = []
+        for prompt in prompts:
+            messages = [SystemMessage(content=system)] if system else []
+            msg = model.invoke([*messages, HumanMessage(content=prompt)], config=config)
+            usage = getattr(msg, "usage_metadata", None) or {}
+            out.append(Completion(getattr(msg, "content", str(msg)), usage.get("total_tokens")))
+        return out
+
+
+class OllamaProvider(Provider):
+    """
+    One model on an Ollama server via /api/generate, reusing a pooled httpx
+    client. OpenAI-style parameters are renamed to Ollama options
+    (`max_tokens` → `num_predict`); the rest pass through as options.
+    """
+
+    OPTION_NAMES = {"max_tokens": "num_predict", "max_completion_tokens": "num_predict"}
+
+    def __init__(self, model: str, client: Any, *, name: Optional[str] = None, concurrency: int = 2,
+                 tokens_per_minute: Optional[int] = None, keep_alive: str = "30m"):
+        self.name, self.model, self.client = name or f"ollama:{model}", model, client
+        self.concurrency, self.tokens_per_minute, self.keep_alive = concurrency, tokens_per_minute, keep_alive
+
+    def generate(self, prompts: List[str], **params: Any) -> List[Completion]:
+        out = []
+        for prompt in prompts:
+            r = self.client.post("/api/generate", json={
+                "model": self.model, "prompt": prompt, "stream": False, "keep_alive": self.keep_alive,
+                "options": {self.OPTION_NAMES.get(k, k): v for k, v in params.items()},
+            })
+            r.raise_for_status()
+            body = r.json()
+            out.append(Completion(body.get("response", ""),
+                                  (body.get("prompt_eval_count") or 0) + (body.get("eval_count") or 0) or None))
+        return out
+
+
+# -----------------------------
+# Dispatcher
+# -----------------------------
+@dataclass
+class _Request:
+    key: str
+    prompt: str
+    params: Dict[str, Any]
+    est_tokens: int
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class DispatchStats:
+    requests: int = 0
+    coalesced: int = 0          # served by an identical in-flight request
+    calls: int = 0              # provider calls made
+    batched: int = 0            # prompts sent in calls with more than one prompt
+    tokens_estimated: int = 0
+    tokens_reported: int = 0
+    throttled_s: float = 0.0    # time spent waiting for token budget
+    errors: int = 0
+
+
+class _Lane:
+    """Queue, collector thread, call pool and token bucket of one provider."""
+
+    def __init__(self, provider: Provider, window: float):
+        self.provider = provider
+        self.window = window
+        self.queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self.bucket = TokenBucket(provider.tokens_per_minute) if provider.tokens_per_minute else None
+        self.pool = ThreadPoolExecutor(max_workers=provider.concurrency, thread_name_prefix=f"llm-{provider.name}")
+        self.slots = threading.Semaphore(provider.concurrency)
+        self.stats = DispatchStats()
+        self.thread: Optional[threading.Thread] = None
+
+
+class Dispatcher:
+    """
+    Shared front door for LLM calls; safe to use from many threads/sessions.
+    `submit()` returns a Future[str]; `invoke()` waits for it.
+    """
+
+    def __init__(self, providers: Sequence[Provider] = (), *, window: float = 0.02,
+                 token_estimator: Callable[[str], int] = estimate_tokens, default_max_tokens: int = 256):
+        self.window = window
+        self.token_estimator = token_estimator
+        self.default_max_tokens = default_max_tokens
+        self._lanes: Dict[str, _Lane] = {}
+        self._inflight: Dict[str, _Request] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        for p in providers:
+            self.add_provider(p)
+
+    def add_provider(self, provider: Provider) -> None:
+        lane = _Lane(provider, self.window)
+        lane.thread = threading.Thread(target=self._collect, args=(lane,), name=f"dispatch-{provider.name}",
+                                       daemon=True)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("dispatcher is closed")
+            if provider.name in self._lanes:
+                raise ValueError(f"Provider already registered: {provider.name}")
+            self._lanes[provider.name] = lane
+        lane.thread.start()
+
+    # --- submission ---
+    @staticmethod
+    def request_key(provider: str, prompt: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps([provider, prompt, params], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def submit(self, provider: str, prompt: str, **params: Any) -> Future:
+        key = self.request_key(provider, prompt, params)
+        # Checked and enqueued under the lock: close() puts its sentinel under the
+        # same lock, so no request can land behind it
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("dispatcher is closed")
+            lane = self._lanes[provider]
+            lane.stats.requests += 1
+            existing = self._inflight.get(key)
+            if existing is not None:
+                lane.stats.coalesced += 1
+                return existing.future
+            max_tokens = params.get("max_tokens") or params.get("num_predict") or self.default_max_tokens
+            est = self.token_estimator(prompt) + int(max_tokens)
+            req = _Request(key, prompt, params, est)
+            self._inflight[key] = req
+            lane.queue.put(req)
+        return req.future
+
+    def invoke(self, provider: str, prompt: str, timeout: Optional[float] = None, **params: Any) -> str:
+        return self.submit(provider, prompt, **params).result(timeout)
+
+    def map(self, provider: str, prompts: Sequence[str], timeout: Optional[float] = None, **params: Any) -> List[str]:
+        futures = [self.submit(provider, p, **params) for p in prompts]
+        return [f.result(timeout) for f in futures]
+
+    # --- batching ---
+    def _collect(self, lane: _Lane) -> None:
+        p = lane.provider
+        while True:
+            first = lane.queue.get()
+            if first is None:
+                return
+            batch = [first]
+            if p.max_batch > 1:
+                deadline = time.monotonic() + lane.window
+                while len(batch) < p.max_batch:
+                    try:
+                        nxt = lane.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if nxt is None:
+                        lane.queue.put(None)
+                        break
+                    batch.append(nxt)
+            # One call per distinct parameter set
+            groups: Dict[str, List[_Request]] = {}
+            for req in batch:
+                groups.setdefault(json.dumps(req.params, sort_keys=True, default=str), []).append(req)
+            for group in groups.values():
+                est = sum(r.est_tokens for r in group)
+                if lane.bucket is not None:
+                    waited = lane.bucket.acquire(est)
+                    with self._lock:
+                        lane.stats.throttled_s += waited
+                lane.slots.acquire()  # bounded in-flight calls keep batches forming while the pool is busy
+                lane.pool.submit(self._call, lane, group, est)
+
+    def _call(self, lane: _Lane, group: List[_Request], est: int) -> None:
+        try:
+            results = lane.provider.generate([r.prompt for r in group], **group[0].params)
+            if len(results) != len(group):
+                raise RuntimeError(f"{lane.provider.name} returned {len(results)} results for {len(group)} prompts")
+            reported = sum(c.tokens for c in results if c.tokens is not None)
+            if lane.bucket is not None and all(c.tokens is not None for c in results):
+                lane.bucket.adjust(reported - est)
+            with self._lock:
+                lane.stats.calls += 1
+                lane.stats.batched += len(group) if len(group) > 1 else 0
+                lane.stats.tokens_estimated += est
+                lane.stats.tokens_reported += reported
+            for req, res in zip(group, results):
+                self._finish(req, result=res.text)
+        except Exception as e:
+            with self._lock:
+                lane.stats.calls += 1
+                lane.stats.errors += 1
+            for req in group:
+                self._finish(req, error=e)
+        finally:
+            lane.slots.release()
+
+    def _finish(self, req: _Request, *, result: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._inflight.pop(req.key, None)
+        if error is not None:
+            req.future.set_exception(error)
+        else:
+            req.future.set_result(result)
+
+    # --- introspection & shutdown ---
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: {**asdict(lane.stats),
+                           "tokens_available": lane.bucket.available if lane.bucket else None}
+                    for name, lane in self._lanes.items()}
+
+    def close(self) -> None:
+        """Finish queued requests, stop the lanes, and fail anything still pending."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            lanes = list(self._lanes.values())
+            for lane in lanes:
+                lane.queue.put(None)
+        for lane in lanes:
+            lane.thread.join()
+            lane.pool.shutdown(wait=True)
+        with self._lock:
+            pending, self._inflight = list(self._inflight.values()), {}
+        for req in pending:
+            if not req.future.done():
+                req.future.set_exception(RuntimeError("dispatcher closed before the request completed"))
+
+
+# -----------------------------
+# Demo
+# -----------------------------
+def _fake_llm(latency: float, per_prompt: float) -> Callable[..., List[Completion]]:
+    """Fake model: fixed call latency plus a small per-prompt cost (like a batched forward pass)."""
+    def generate(prompts: List[str], **params: Any) -> List[Completion]:
+        time.sleep(latency + per_prompt * len(prompts))
+        return [Completion(f"echo: {p[:20]}", tokens=len(p) // 4 + 16) for p in prompts]
+    return generate
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Compare one-call-per-request with the batching dispatcher (fake LLM).")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--unique", type=int, default=8, help="distinct prompts among the requests")
+    ap.add_argument("--latency", type=float, default=0.05, help="fake provider latency per call (s)")
+    ap.add_argument("--tpm", type=int, default=0, help="tokens-per-minute budget (0 = unlimited)")
+    ap.add_argument("--max-batch", type=int, default=16)
+    args = ap.parse_args(argv)
+
+    prompts = [f"Summarize case {i % args.unique}: physiotherapy, pain 3/10, discharge pending" for i in range(args.requests)]
+    fake = _fake_llm(args.latency, 0.002)
+    report: Dict[str, Any] = {}
+
+    # Baseline: every request is its own provider call (same concurrency, no budget)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda p: fake([p]), prompts))
+    elapsed = time.perf_counter() - t0
+    report["one call per request"] = {"seconds": round(elapsed, 3), "req_per_s": round(len(prompts) / elapsed, 1),
+                                      "calls": len(prompts)}
+
+    dispatcher = Dispatcher([CallableProvider("fake", fake, max_batch=args.max_batch, concurrency=4,
+                                              tokens_per_minute=args.tpm or None)], window=0.02)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:  # concurrent sessions
+        list(pool.map(lambda p: dispatcher.invoke("fake", p), prompts))
+    elapsed = time.perf_counter() - t0
+    report["batched + coalesced"] = {"seconds": round(elapsed, 3), "req_per_s": round(len(prompts) / elapsed, 1),
+                                     **dispatcher.stats()["fake"]}
+    dispatcher.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Supervisor for a local Ollama server (or any Ollama-compatible endpoint).
+
+- Connection reuse: one pooled keep-alive HTTP client for probes and warm-up
+  (async) and one for callers (`supervisor.client`), instead of a fresh
+  connection per request.
+- Health: GET /api/version on an asyncio loop in a background thread, every
+  `probe_interval` while healthy; failures retry with capped exponential
+  backoff + jitter and can (re)launch the server through a `launcher`.
+- Warm-up: once the server is up, every configured model is loaded with an
+  empty /api/generate request and `keep_alive`, and /api/ps is re-checked on
+  each probe so a model unloaded by the server is warmed again. The first real
+  request then does not pay the model load.
+- Readiness: `is_ready()`, `wait_ready()`, `status()` and `routing_penalty()`
+  are what routers read before picking a local model.
+
+`FakeOllamaServer` implements the endpoints above with a configurable load
+delay and outage switch, so the supervisor can be exercised without Ollama:
+
+    python llm_supervisor.py --fake --model llama3.2:1b
+    python llm_supervisor.py --url http://127.0.0.1:11434 --model llama3.2:1b --launch
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+
+def _base_url(host: str) -> str:
+    """OLLAMA_HOST as Ollama accepts it: 'host:port' or a full http(s):// URL."""
+    host = host.strip().rstrip("/")
+    return host if "://" in host else f"http://{host}"
+
+
+OLLAMA_URL = _base_url(os.environ.get("OLLAMA_HOST", "127.0.0.1:11434"))
+
+# Model states
+COLD = "cold"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+def model_key(name: str) -> str:
+    """Ollama model names are case-insensitive and default to the ':latest' tag."""
+    name = name.strip().lower()
+    return name if ":" in name else f"{name}:latest"
+
+
+@dataclass
+class Backoff:
+    """Capped exponential backoff with proportional jitter."""
+    base: float = 0.5
+    factor: float = 2.0
+    maximum: float = 30.0
+    jitter: float = 0.1
+    attempt: int = 0
+
+    def next(self) -> float:
+        delay = min(self.maximum, self.base * self.factor ** self.attempt)
+        self.attempt += 1
+        return delay * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def reset(self) -> None:
+        self.attempt = 0
+
+
+@dataclass
+class ModelState:
+    name: str
+    state: str = COLD
+    load_s: Optional[float] = None      # duration of the last warm-up
+    error: Optional[str] = None
+    updated: float = field(default_factory=time.time)
+    failures: int = 0                   # consecutive failed warm-ups
+    retry_at: float = 0.0               # FAILED models are not re-warmed before this time
+
+
+# -----------------------------
+# Launchers (used when the server does not answer)
+# -----------------------------
+def serve_launcher(binary: str = "ollama") -> Optional[Callable[[], None]]:
+    """Start `ollama serve` in the background (None if the binary is not on PATH)."""
+    path = shutil.which(binary)
+    if not path:
+        return None
+
+    def launch() -> None:
+        subprocess.Popen([path, "serve"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True)
+    return launch
+
+
+def wsl_windows_launcher(pwsh: str = "/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe"
+                         ) -> Optional[Callable[[], None]]:
+    """Start the Windows Ollama app from WSL (None when not running under WSL)."""
+    if not os.path.exists(pwsh):
+        return None
+
+    def launch() -> None:
+        subprocess.Popen([pwsh, "-Command", "Start-Process -WindowStyle Hidden Ollama"],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return launch
+
+
+def default_launcher() -> Optional[Callable[[], None]]:
+    return serve_launcher() or wsl_windows_launcher()
+
+
+# -----------------------------
+# Supervisor
+# -----------------------------
+class OllamaSupervisor:
+    """
+    Background health prober and model warmer for one Ollama endpoint.
+    Thread-safe; `start()` once per process and share it (e.g. st.cache_resource).
+    """
+
+    def __init__(self, base_url: str = OLLAMA_URL, models: Iterable[str] = (), *,
+                 probe_interval: float = 10.0, probe_timeout: float = 2.0, backoff: Optional[Backoff] = None,
+                 launcher: Optional[Callable[[], None]] = None, relaunch_every: int = 5,
+                 keep_alive: str = "30m", warm_timeout: float = 300.0, max_connections: int = 16):
+        self.base_url = base_url.rstrip("/")
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.backoff = backoff or Backoff()
+        self.launcher = launcher
+        self.relaunch_every = relaunch_every
+        self.keep_alive = keep_alive
+        self.warm_timeout = warm_timeout
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = httpx.Client(base_url=self.base_url, limits=self._limits,
+                                   timeout=httpx.Timeout(warm_timeout, connect=probe_timeout))
+
+        self.up = False
+        self.version: Optional[str] = None
+        self.failures = 0
+        self.launches = 0
+        self.last_error: Optional[str] = None
+        self.last_probe: Optional[float] = None
+        self._models: Dict[str, ModelState] = {model_key(m): ModelState(model_key(m)) for m in models}
+        self._warming: Dict[str, "asyncio.Task[None]"] = {}
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._cond = threading.Condition()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # --- lifecycle ---
+    def start(self) -> "OllamaSupervisor":
+        if self._thread is None:
+            started = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(started,), name="ollama-supervisor",
+                                            daemon=True)
+            self._thread.start()
+            started.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join()
+            self._thread = None
+        self.client.close()
+
+    def __enter__(self) -> "OllamaSupervisor":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _run(self, started: threading.Event) -> None:
+        asyncio.run(self._main(started))
+
+    async def _main(self, started: threading.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        started.set()
+        async with httpx.AsyncClient(base_url=self.base_url, limits=self._limits) as aclient:
+            self._aclient = aclient
+            while not self._stop.is_set():
+                try:
+                    delay = await self._probe()
+                except Exception as e:  # never let one bad response end supervision
+                    log.warning("ollama probe failed: %s: %s", type(e).__name__, e)
+                    self._set_down(f"{type(e).__name__}: {e}")
+                    delay = self.backoff.next()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            for task in self._warming.values():
+                task.cancel()
+
+    # --- probing ---
+    async def _probe(self) -> float:
+        """One health check (+ residency refresh and warm-ups); returns the delay until the next one."""
+        self.last_probe = time.time()
+        try:
+            r = await self._aclient.get("/api/version", timeout=self.probe_timeout)
+            r.raise_for_status()
+            version = r.json().get("version")
+        except (httpx.HTTPError, ValueError) as e:
+            self._set_down(f"{type(e).__name__}: {e}")
+            return self.backoff.next()
+
+        self.backoff.reset()
+        with self._cond:
+            self.up, self.version, self.failures, self.last_error = True, version, 0, None
+            self._cond.notify_all()
+        try:
+            resident = await self._resident()
+        except Exception:
+            resident = None  # older servers without /api/ps (or an odd body): rely on warm-up results
+        for name, st in list(self._models.items()):
+            if resident is not None and name in resident:
+                if st.state != READY:
+                    self._set_model(name, READY)
+            elif st.state == FAILED and time.time() < st.retry_at:
+                continue  # warm-up failures back off per model
+            elif name not in self._warming and (st.state != READY or resident is not None):
+                self._warming[name] = asyncio.create_task(self._warm(name))
+        return self.probe_interval
+
+    def _set_down(self, error: str) -> None:
+        with self._cond:
+            self.up = False
+            self.failures += 1
+            self.last_error = error
+            for st in self._models.values():
+                if st.state == READY:
+                    st.state, st.updated = COLD, time.time()
+            self._cond.notify_all()
+        if self.launcher and (self.failures == 1 or self.failures % self.relaunch_every == 0):
+            try:
+                self.launcher()
+                self.launches += 1
+            except Exception as e:  # launch problems surface through the next failed probe
+                self.last_error = f"{error}; launch failed: {type(e).__name__}: {e}"
+
+    async def _resident(self) -> Set[str]:
+        r = await self._aclient.get("/api/ps", timeout=self.probe_timeout)
+        r.raise_for_status()
+        return {model_key(m.get("name") or m.get("model", "")) for m in r.json().get("models", [])}
+
+    # --- warm-up ---
+    async def _warm(self, name: str) -> None:
+        self._set_model(name, LOADING)
+        t0 = time.perf_counter()
+        try:
+            r = await self._aclient.post("/api/generate", timeout=self.warm_timeout, json={
+                "model": name, "prompt": "", "stream": False, "keep_alive": self.keep_alive,
+            })
+            r.raise_for_status()
+            self._set_model(name, READY, load_s=time.perf_counter() - t0)
+        except Exception as e:
+            self._set_model(name, FAILED, error=f"{type(e).__name__}: {e}")
+        finally:
+            self._warming.pop(name, None)
+
+    def _set_model(self, name: str, state: str, *, load_s: Optional[float] = None,
+                   error: Optional[str] = None) -> None:
+        with self._cond:
+            st = self._models.setdefault(name, ModelState(name))
+            st.state, st.error, st.updated = state, error, time.time()
+            if state == FAILED:
+                st.failures += 1
+                st.retry_at = st.updated + min(600.0, self.probe_interval * 2 ** (st.failures - 1))
+            elif state == READY:
+                st.failures, st.retry_at = 0, 0.0
+            if load_s is not None:
+                st.load_s = load_s
+            self._cond.notify_all()
+
+    def warm(self, model: str) -> Future:
+        """Add a model to the warm set and load it now; the Future resolves when the attempt finishes."""
+        name = model_key(model)
+        with self._cond:
+            self._models.setdefault(name, ModelState(name))
+        if self._loop is None:
+            raise RuntimeError("supervisor is not started")
+
+        async def run() -> None:
+            task = self._warming.get(name)
+            if task is None:
+                task = self._warming[name] = asyncio.create_task(self._warm(name))
+            await task
+        return asyncio.run_coroutine_threadsafe(run(), self._loop)
+
+    # --- readiness (read by routers / UI) ---
+    def is_up(self) -> bool:
+        return self.up
+
+    def is_ready(self, model: Optional[str] = None) -> bool:
+        """Server up and, if given, the model resident; with no model, all configured models resident."""
+        with self._cond:
+            return self._ready_locked(model)
+
+    def wait_ready(self, model: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._ready_locked(model), timeout)
+
+    def _ready_locked(self, model: Optional[str]) -> bool:
+        if not self.up:
+            return False
+        if model is not None:
+            st = self._models.get(model_key(model))
+            return bool(st and st.state == READY)
+        return all(st.state == READY for st in self._models.values())
+
+    def routing_penalty(self, model: str) -> float:
+        """Score penalty for routers (lower = better): 0 ready, 0.5 warming/cold, 2.0 failed or server down."""
+        with self._cond:
+            if not self.up:
+                return 2.0
+            st = self._models.get(model_key(model))
+            if st is None or st.state in (COLD, LOADING):
+                return 0.5
+            return 0.0 if st.state == READY else 2.0
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "url": self.base_url,
+                "up": self.up,
+                "version": self.version,
+                "failures": self.failures,
+                "launches": self.launches,
+                "last_error": self.last_error,
+                "last_probe": self.last_probe,
+                "models": {name: asdict(st) for name, st in self._models.items()},
+            }
+
+
+# -----------------------------
+# Fake server (tests / demos without Ollama)
+# -----------------------------
+class FakeOllamaServer:
+    """
+    Minimal Ollama look-alike on 127.0.0.1: /api/version, /api/ps, /api/generate.
+    Loading a model takes `load_delay` seconds; `available = False` answers 503;
+    `unload(name)` simulates keep_alive expiry. Counts requests and TCP connections.
+    """
+
+    def __init__(self, load_delay: float = 0.2, version: str = "0.0.0-fake"):
+        self.load_delay = load_delay
+        self.version = version
+        self.available = True
+        self.loaded: Set[str] = set()
+        self.requests: Dict[str, int] = {}
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def unload(self, model: str) -> None:
+        with self._lock:
+            self.loaded.discard(model_key(model))
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send(self, code: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(code)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # client gave up (e.g. supervisor stopped mid warm-up)
+
+            def _count(self) -> bool:
+                with server._lock:
+                    server.requests[self.path] = server.requests.get(self.path, 0) + 1
+                if not server.available:
+                    self._send(503, {"error": "unavailable"})
+                    return False
+                return True
+
+            def do_GET(self) -> None:
+                if not self._count():
+                    return
+                if self.path == "/api/version":
+                    self._send(200, {"version": server.version})
+                elif self.path == "/api/ps":
+                    with server._lock:
+                        models = [{"name": m, "model": m} for m in sorted(server.loaded)]
+                    self._send(200, {"models": models})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                if not self._count():
+                    return
+                if self.path != "/api/generate":
+                    self._send(404, {"error": "not found"})
+                    return
+                name = model_key(body.get("model", ""))
+                with server._lock:
+                    cold = name not in server.loaded
+                if cold:
+                    time.sleep(server.load_delay)
+                    with server._lock:
+                        server.loaded.add(name)
+                self._send(200, {"model": name, "response": "ok" if body.get("prompt") else "", "done": True})
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Probe and warm an Ollama server; prints status JSON when ready.")
+    ap.add_argument("--url", default=OLLAMA_URL)
+    ap.add_argument("--model", action="append", default=[], help="model to keep warm (repeatable)")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--launch", action="store_true", help="start the server (ollama serve / WSL app) if down")
+    ap.add_argument("--fake", action="store_true", help="run against an in-process fake server")
+    args = ap.parse_args(argv)
+
+    fake = FakeOllamaServer().start() if args.fake else None
+    url = fake.url if fake else args.url
+    with OllamaSupervisor(url, args.model, probe_interval=1.0,
+                          launcher=default_launcher() if args.launch else None) as sup:
+        t0 = time.perf_counter()
+        ok = sup.wait_ready(timeout=args.timeout)
+        status = {**sup.status(), "ready": ok, "waited_s": round(time.perf_counter() - t0, 3)}
+    if fake:
+        status["fake_connections"] = fake.connections
+        fake.stop()
+    print(json.dumps(status, indent=2, default=str))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
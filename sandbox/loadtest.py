@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless load test for the Streamlit app itself (app.py), driven over the same
+websocket protocol the browser uses. For each concurrency stage N, N sessions
+connect at once and each walks through every sidebar page, submits the
+Playground and Impact forms and opens the icons page, with a random think time
+between actions.
+
+Reported per stage: rerun latency p50/p95 per page (BackMsg sent → script
+finished), bytes pushed to the client per rerun, and server RSS growth per
+connected session. Run it before and after a caching change and compare.
+
+Usage (from the sandbox directory):
+    python loadtest.py --users 1,5,10,20
+    python loadtest.py --users 10 --iterations 3 --think 1.0 --out bench/load.json
+    python loadtest.py --users 1,10 --out bench/load.json --compare bench/load_baseline.json
+    python loadtest.py --url ws://localhost:8501 --server-pid 4242 --users 5   # attach to a running server
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import streamlit
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from benchmarks import _git_commit
+from resources import rss_mb
+from views import PAGES
+
+BASE = Path(__file__).resolve().parent
+
+NAV_LABEL = "Go to"
+PLAYGROUND_FORM = {"Insurance company": "SaludPlus", "Medical Act (trigger)": "outpatient surgery",
+                   "Primary diagnosis / reason": "acute lumbosciatica"}
+PLAYGROUND_SUBMIT = "Generate checklist + draft"
+IMPACT_SUBMIT = "Compute impact"
+
+_STRING_WIDGETS = {"radio", "selectbox", "text_input", "text_area"}
+
+
+@dataclass
+class Rerun:
+    """One script run as seen by the client."""
+    action: str
+    seconds: float
+    bytes: int
+    messages: int
+    error: Optional[str] = None
+
+
+# -----------------------------
+# Websocket session (one browser tab)
+# -----------------------------
+class Session:
+    """
+    Minimal Streamlit client: sends `rerun_script` BackMsgs carrying widget
+    states and reads ForwardMsgs until the script finishes. Widgets are found by
+    label in the elements of the last run, and values persist across reruns
+    like in the browser (triggers such as form submit are sent once). A rerun
+    that does not finish within `timeout` seconds raises TimeoutError.
+    """
+
+    def __init__(self, url: str, query_string: str = "", timeout: float = 60.0):
+        self.url = url.rstrip("/") + "/_stcore/stream"
+        self.query_string = query_string
+        self.timeout = timeout
+        self._ws = None
+        self._widgets: Dict[str, Any] = {}       # label → (element type, proto) from the last run
+        self._state: Dict[str, WidgetState] = {}  # widget id → persistent value
+        self._triggers: List[WidgetState] = []
+
+    async def connect(self) -> "Session":
+        self._ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None,
+                                           open_timeout=60, ping_interval=None)
+        return self
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+
+    def set(self, label: str, value: Any) -> None:
+        kind, proto = self._widget(label)
+        ws = WidgetState(id=proto.id)
+        if kind in _STRING_WIDGETS:
+            ws.string_value = str(value)
+        elif kind == "number_input":
+            ws.double_value = float(value)
+        elif kind == "slider":
+            ws.double_array_value.data.append(float(value))
+        elif kind == "checkbox":
+            ws.bool_value = bool(value)
+        else:
+            raise ValueError(f"Unsupported widget {kind!r} for {label!r}")
+        self._state[proto.id] = ws
+
+    def click(self, label: str) -> None:
+        _, proto = self._widget(label)
+        self._triggers.append(WidgetState(id=proto.id, trigger_value=True))
+
+    def _widget(self, label: str):
+        if label not in self._widgets:
+            raise KeyError(f"No widget labelled {label!r} in the last run")
+        return self._widgets[label]
+
+    async def rerun(self, action: str) -> Rerun:
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        msg.rerun_script.widget_states.widgets.extend([*self._state.values(), *self._triggers])
+        self._triggers = []
+        t0 = time.perf_counter()
+        deadline = t0 + self.timeout
+        await self._ws.send(msg.SerializeToString())
+
+        widgets: Dict[str, Any] = {}
+        size = count = 0
+        error = None
+        while True:
+            try:
+                data = await asyncio.wait_for(self._ws.recv(), max(0.0, deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{action}: script did not finish within {self.timeout:.0f} s") from None
+            size += len(data)
+            count += 1
+            fwd = ForwardMsg()
+            fwd.ParseFromString(data)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                proto = getattr(element, etype)
+                if etype == "exception" and error is None:
+                    error = f"{proto.type}: {proto.message}"
+                elif getattr(proto, "id", "") and getattr(proto, "label", ""):
+                    widgets[proto.label] = (etype, proto)
+            elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    error = error or "compile error"
+                break
+        seconds = time.perf_counter() - t0
+        self._widgets = widgets
+        live = {proto.id for _, proto in widgets.values()}
+        self._state = {k: v for k, v in self._state.items() if k in live}
+        return Rerun(action, seconds, size, count, error)
+
+
+async def journey(session: Session, iterations: int, think: float, rng: random.Random) -> List[Rerun]:
+    """One user: first load, then every page in sidebar order, submitting the forms on the way."""
+    runs = [await session.rerun("(first load)")]
+    for _ in range(iterations):
+        for page in PAGES:
+            await asyncio.sleep(rng.uniform(0, think))
+            session.set(NAV_LABEL, page)
+            runs.append(await session.rerun(page))
+            if page == "Playground":
+                for label, value in PLAYGROUND_FORM.items():
+                    session.set(label, value)
+                session.click(PLAYGROUND_SUBMIT)
+                runs.append(await session.rerun("Playground: submit"))
+            elif page == "Impact":
+                session.set("Reports per month", rng.randint(10, 400))
+                session.click(IMPACT_SUBMIT)
+                runs.append(await session.rerun("Impact: submit"))
+    return runs
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+def _stats(runs: List[Rerun]) -> Dict[str, float]:
+    ms = np.array([r.seconds * 1e3 for r in runs])
+    kb = np.array([r.bytes / 1024 for r in runs])
+    return {
+        "n": len(runs),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "max_ms": round(float(ms.max()), 1),
+        "kb_p50": round(float(np.percentile(kb, 50)), 1),
+        "kb_max": round(float(kb.max()), 1),
+    }
+
+
+async def _sample_peak(pid: Optional[int], peak: List[float], stop: asyncio.Event, every: float = 0.2) -> None:
+    while not stop.is_set():
+        rss = rss_mb(pid) if pid else None
+        if rss is not None:
+            peak[0] = max(peak[0], rss)
+        try:
+            await asyncio.wait_for(stop.wait(), every)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_stage(url: str, users: int, iterations: int, think: float, query_string: str,
+                    server_pid: Optional[int], seed: int, timeout: float = 60.0) -> Dict[str, Any]:
+    """N concurrent sessions; RSS is read again while all of them are still connected."""
+    rss_before = rss_mb(server_pid) if server_pid else None
+    peak, stop = [rss_before or 0.0], asyncio.Event()
+    sampler = asyncio.create_task(_sample_peak(server_pid, peak, stop))
+
+    sessions = [Session(url, query_string, timeout) for _ in range(users)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(s.connect() for s in sessions))
+    results = await asyncio.gather(*(journey(s, iterations, think, random.Random(seed + i))
+                                     for i, s in enumerate(sessions)), return_exceptions=True)
+    wall = time.perf_counter() - t0
+    rss_connected = rss_mb(server_pid) if server_pid else None
+    await asyncio.gather(*(s.close() for s in sessions))
+    stop.set()
+    await sampler
+
+    runs: List[Rerun] = []
+    failures: List[str] = []
+    for r in results:
+        if isinstance(r, BaseException):
+            failures.append(f"{type(r).__name__}: {r}")
+        else:
+            runs.extend(r)
+    failures += [f"{r.action}: {r.error}" for r in runs if r.error]
+
+    by_action: Dict[str, List[Rerun]] = defaultdict(list)
+    for r in runs:
+        by_action[r.action].append(r)
+    memory = None
+    if rss_before is not None and rss_connected is not None:
+        memory = {"rss_before_mb": round(rss_before, 1), "rss_connected_mb": round(rss_connected, 1),
+                  "rss_peak_mb": round(max(peak[0], rss_connected), 1),
+                  "per_session_mb": round((rss_connected - rss_before) / users, 2)}
+    return {
+        "users": users,
+        "wall_s": round(wall, 2),
+        "reruns": len(runs),
+        "failures": failures,
+        "overall": _stats(runs) if runs else {},
+        "pages": {action: _stats(rs) for action, rs in by_action.items()},
+        "session_kb": round(sum(r.bytes for r in runs) / 1024 / max(1, users), 1),
+        "memory": memory,
+    }
+
+
+def print_stage(stage: Dict[str, Any]) -> None:
+    print(f"\n== {stage['users']} concurrent session(s): {stage['reruns']} reruns in {stage['wall_s']} s, "
+          f"{len(stage['failures'])} failure(s) ==")
+    print(f"{'page / action':28s} {'n':>4s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s} {'KB p50':>8s} {'KB max':>8s}")
+    for action, s in [*stage["pages"].items(), ("ALL", stage["overall"])]:
+        if s:
+            print(f"{action:28s} {s['n']:4d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['max_ms']:9.1f} "
+                  f"{s['kb_p50']:8.1f} {s['kb_max']:8.1f}")
+    print(f"payload per session: {stage['session_kb']} KB")
+    m = stage["memory"]
+    if m:
+        print(f"server RSS {m['rss_before_mb']} → {m['rss_connected_mb']} MB with all sessions connected "
+              f"(peak {m['rss_peak_mb']}), {m['per_session_mb']:+.2f} MB per session")
+    for f in stage["failures"][:5]:
+        print(f"  ! {f}")
+
+
+# -----------------------------
+# Server
+# -----------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, env: Dict[str, str], timeout: float = 60.0) -> subprocess.Popen:
+    """`streamlit run app.py` headless on `port`; returns once /_stcore/health answers."""
+    cmd = [sys.executable, "-m", "streamlit", "run", str(BASE / "app.py"), "--server.headless", "true",
+           "--server.port", str(port), "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"]
+    proc = subprocess.Popen(cmd, cwd=BASE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with {proc.returncode}: {proc.stderr.read().decode()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError(f"streamlit did not become healthy within {timeout:.0f} s")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """(users, page) pairs whose p95 got slower than `threshold` × baseline p95."""
+    base = {(s["users"], a): p for s in baseline.get("stages", []) for a, p in s["pages"].items()}
+    regressions = []
+    for stage in current["stages"]:
+        for action, p in stage["pages"].items():
+            b = base.get((stage["users"], action))
+            if not b:
+                continue
+            ratio = p["p95_ms"] / b["p95_ms"] if b["p95_ms"] else float("inf")
+            flag = "REGRESSION" if ratio > threshold else ""
+            print(f"{stage['users']:4d} users  {action:28s} p95 {b['p95_ms']:8.1f} → {p['p95_ms']:8.1f} ms  "
+                  f"{ratio:5.2f}x  {flag}")
+            if ratio > threshold:
+                regressions.append(f"{stage['users']}:{action}")
+    return regressions
+
+
+async def run(url: str, stages: List[int], args: argparse.Namespace, server_pid: Optional[int]) -> Dict[str, Any]:
+    query_string = f"tenant={args.tenant}" if args.tenant else ""
+    if args.warm_up:  # first visits import page modules and fill caches; keep them out of stage 1
+        await run_stage(url, 1, 1, 0.0, query_string, None, args.seed, args.timeout)
+    out = []
+    for users in stages:
+        stage = await run_stage(url, users, args.iterations, args.think, query_string, server_pid, args.seed,
+                                args.timeout)
+        print_stage(stage)
+        out.append(stage)
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "streamlit": streamlit.__version__,
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "think_s": args.think,
+            "timeout_s": args.timeout,
+            "warm_up": args.warm_up,
+            "tenant": args.tenant,
+        },
+        "stages": out,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", default="1,5,10", help="comma-separated concurrency stages")
+    ap.add_argument("--iterations", type=int, default=1, help="page tours per session")
+    ap.add_argument("--think", type=float, default=0.5, help="max random pause between actions (s)")
+    ap.add_argument("--tenant", default=None, help="tenant id passed as ?tenant=")
+    ap.add_argument("--url", default=None, help="attach to a running server (e.g. ws://localhost:8501)")
+    ap.add_argument("--server-pid", type=int, default=None, help="pid of the attached server, for RSS")
+    ap.add_argument("--warm-up", action=argparse.BooleanOptionalAction, default=True,
+                    help="run one unrecorded session first (default: on)")
+    ap.add_argument("--timeout", type=float, default=60.0,
+                    help="seconds a rerun may take before the session is counted as failed")
+    ap.add_argument("--slo-ms", type=float, default=1000.0, help="p95 rerun latency considered acceptable")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, help="write results JSON here")
+    ap.add_argument("--compare", type=Path, help="baseline results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="max allowed p95 slowdown ratio")
+    args = ap.parse_args(argv)
+    stages = [int(n) for n in args.users.split(",") if n.strip()]
+
+    proc = None
+    url, server_pid = args.url, args.server_pid
+    if url is None:
+        port = _free_port()
+        env = dict(os.environ)
+        # Keep load-test drafts out of the real audit trail
+        env.setdefault("AUDIT_DIR", tempfile.mkdtemp(prefix="loadtest_audit_"))
+        proc = start_server(port, env)
+        url, server_pid = f"ws://127.0.0.1:{port}", proc.pid
+        print(f"streamlit started on port {port} (pid {proc.pid})")
+    try:
+        current = asyncio.run(run(url, stages, args, server_pid))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    ok = [s["users"] for s in current["stages"] if s["overall"] and s["overall"]["p95_ms"] <= args.slo_ms
+          and not s["failures"]]
+    print(f"\nLargest stage within p95 ≤ {args.slo_ms:.0f} ms and no failures: "
+          f"{max(ok) if ok else 'none'} concurrent session(s)")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"Results written to {args.out}")
+
+    if args.compare:
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.2f}x):")
+        regressions = compare(current, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pure helpers behind the Impact and Playground pages: ROI model, checklist and
+report-draft text. No Streamlit imports, so they can be reused by exports,
+benchmarks and batch jobs.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Mapping
+
+# Risk level → conservatism factor applied to the on-time approval benefit
+RISK_FACTORS = {"Low": 1.0, "Medium": 0.7, "High": 0.5}
+
+
+# --- Helper: convert multiline text into bullets without using backslashes in f-strings ---
+def bullets_from_multiline(text: str, indent="  - "):
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    return "\n".join(f"{indent}{ln}" for ln in lines) if lines else f"{indent}(pending)"
+
+
+# -----------------------------
+# Impact & ROI
+# -----------------------------
+@dataclass
+class ImpactInputs:
+    reports_per_month: float = 40
+    reject_rate_pct: float = 15.0
+    expected_reduction_reject_pct: float = 50.0
+    avg_delay_days: float = 5.0
+    minutes_now: float = 45
+    minutes_target: float = 25
+    cost_per_hour_usd: float = 75.0
+    value_per_on_time_approval_usd: float = 120.0
+    deploy_cost_monthly_usd: float = 600.0
+    risk_level: str = "Medium"
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["risk_factor"] = RISK_FACTORS.get(self.risk_level, 0.7)
+        return d
+
+
+def compute_impact(inp: ImpactInputs) -> Dict[str, Any]:
+    """Derived monthly metrics for one set of assumptions (same formulas as the Impact page)."""
+    rf = RISK_FACTORS.get(inp.risk_level, 0.7)
+
+    mins_saved = max(0, inp.minutes_now - inp.minutes_target)
+    hours_saved_month = inp.reports_per_month * (mins_saved / 60.0)
+    labor_savings = hours_saved_month * inp.cost_per_hour_usd
+
+    avoidable_rej = inp.reports_per_month * (inp.reject_rate_pct / 100.0) * (inp.expected_reduction_reject_pct / 100.0)
+    benefit_on_time = avoidable_rej * inp.value_per_on_time_approval_usd
+    risk_adj_benefit = benefit_on_time * rf
+
+    gross_benefits = labor_savings + risk_adj_benefit
+    deploy = inp.deploy_cost_monthly_usd
+    net_monthly = gross_benefits - deploy
+    roi = (gross_benefits - deploy) / deploy if deploy > 0 else float("inf")
+    payback_months = (deploy / net_monthly) if net_monthly > 0 else None
+
+    return {
+        "minutes_saved": mins_saved,
+        "hours_saved_month": hours_saved_month,
+        "labor_savings_usd": labor_savings,
+        "avoided_rejections_month": avoidable_rej,
+        "risk_adjusted_benefit_usd": risk_adj_benefit,
+        "gross_benefits_usd": gross_benefits,
+        "net_monthly_usd": net_monthly,
+        "roi_monthly": roi,
+        "payback_months": payback_months,
+    }
+
+
+def compute_impact_batch(columns: Mapping[str, Iterable[Any]]):
+    """
+    Vectorized `compute_impact` over many scenarios (e.g. sensitivity grids).
+    `columns` maps ImpactInputs field names to equal-length sequences; missing
+    fields take the dataclass default. Returns a dict of numpy arrays; ROI is
+    inf where deployment cost is 0 and payback is NaN where net impact <= 0.
+    """
+    import numpy as np
+
+    defaults = ImpactInputs()
+    lengths = {len(np.atleast_1d(v)) for v in columns.values()} or {1}
+    n = max(lengths)
+
+    def col(name: str) -> "np.ndarray":
+        if name in columns:
+            return np.broadcast_to(np.asarray(columns[name], dtype=float), (n,))
+        return np.full(n, float(getattr(defaults, name)))
+
+    if "risk_level" in columns:
+        levels = np.broadcast_to(np.asarray(columns["risk_level"]).astype(str), (n,))
+        uniq, inv = np.unique(levels, return_inverse=True)
+        rf = np.array([RISK_FACTORS.get(lv, 0.7) for lv in uniq], dtype=float)[inv]
+    else:
+        rf = np.full(n, RISK_FACTORS.get(defaults.risk_level, 0.7))
+
+    rpm = col("reports_per_month")
+    mins_saved = np.maximum(0.0, col("minutes_now") - col("minutes_target"))
+    hours_saved_month = rpm * (mins_saved / 60.0)
+    labor_savings = hours_saved_month * col("cost_per_hour_usd")
+
+    avoidable_rej = rpm * (col("reject_rate_pct") / 100.0) * (col("expected_reduction_reject_pct") / 100.0)
+    risk_adj_benefit = avoidable_rej * col("value_per_on_time_approval_usd") * rf
+
+    gross_benefits = labor_savings + risk_adj_benefit
+    deploy = col("deploy_cost_monthly_usd")
+    net_monthly = gross_benefits - deploy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(deploy > 0, net_monthly / deploy, np.inf)
+        payback_months = np.where(net_monthly > 0, deploy / net_monthly, np.nan)
+
+    return {
+        "minutes_saved": mins_saved,
+        "hours_saved_month": hours_saved_month,
+        "labor_savings_usd": labor_savings,
+        "avoided_rejections_month": avoidable_rej,
+        "risk_adjusted_benefit_usd": risk_adj_benefit,
+        "gross_benefits_usd": gross_benefits,
+        "net_monthly_usd": net_monthly,
+        "roi_monthly": roi,
+        "payback_months": payback_months,
+    }
+
+
+# -----------------------------
+# Playground: checklist & draft
+# -----------------------------
+def build_checklist(*, insurer: str, trigger: str, diagnosis: str, date_val: Any, case_id: str,
+                    evolution: str, attachments: Iterable[str], compliance_label: str = "HIPAA/GDPR") -> str:
+    """Markdown checklist shown in the Playground."""
+    # Precompute bullets to avoid backslashes inside f-strings
+    evo_bullets = bullets_from_multiline(evolution, indent="  - ")
+    attachment_bullets = bullets_from_multiline("\n".join(attachments), indent="  - ")
+    return f"""
+- Case identification (folio: **{case_id or 'n/a'}**), responsible clinician and date **{date_val}**  
+- Medical Act triggering the benefit: **{trigger or '—'}**  
+- Primary diagnosis / reason: **{diagnosis or '—'}**  
+- Evolution **changes only** with date (format *YYYY-MM-DD*):  
+{evo_bullets}
+- Attachments required by **{insurer or '(define)'}**:  
+{attachment_bullets}
+- Verify **deadlines** and **format** ({compliance_label} compliance)  
+- Final **human review** (step 9) and submission log
+            """
+
+
+def build_draft(*, insurer: str, trigger: str, diagnosis: str, date_val: Any, professional: str,
+                case_id: str, evolution: str, compliance_label: str = "HIPAA/GDPR") -> str:
+    """Plain-text report skeleton sent to the insurer."""
+    return f"""
+MEDICAL REPORT — Benefit activation
+Insurance: {insurer or '—'}    |    Date: {date_val}
+Clinician: {professional or '—'}    |    Case/Folio: {case_id or 'n/a'}
+
+1) Medical Act (trigger)
+   - {trigger or '—'}
+
+2) Primary diagnosis / reason
+   - {diagnosis or '—'}
+
+3) Evolution (changes only, each with date)
+{evolution if evolution.strip() else '- (to be completed by the clinician)'}
+
+4) Clinical rationale & supporting evidence
+   - Key findings, attached exams, applicable guidelines.
+
+5) Request to insurer
+   - Coverage/benefit requested and estimated duration.
+
+6) Compliance & privacy
+   - Prepared under {compliance_label} good practices.
+""".strip()
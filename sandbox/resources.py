@@ -0,0 +1,150 @@
+"""
+Process-wide shared resources for the Streamlit pages (`st.cache_resource`):
+one instance per server process, shared by every session. Heavy modules are
+imported inside the getters, so a page only pays for what it uses.
+
+Tenant data (KPI rollups, export cache, knowledge graph, attachment text
+cache, audit trail) is keyed by tenant id.
+Evictable caches are bounded by `TENANT_CACHE_MAX` tenants each, and when the
+process RSS exceeds `TENANT_MEMORY_LIMIT_MB` the least recently active tenant
+is evicted (one per script run). The tool registry (thread pool) is
+shared compute: tenant rules travel in the tool arguments.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import streamlit as st
+
+from tenants import DEFAULT_TENANT, TenantConfig, load_tenants
+
+TENANT_CACHE_MAX = int(os.environ.get("TENANT_CACHE_MAX", "8"))
+TENANT_MEMORY_LIMIT_MB = float(os.environ.get("TENANT_MEMORY_LIMIT_MB", "0"))  # 0 → no limit
+
+# Tenants by last activity (oldest first), for memory-driven eviction
+_recent: "OrderedDict[str, None]" = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+# --- Tenants (TENANTS_FILE); one per process ---
+@st.cache_resource
+def get_tenants() -> Dict[str, TenantConfig]:
+    return load_tenants()
+
+
+def current_tenant() -> TenantConfig:
+    """Tenant of this session (`tenant_id` in session state), falling back to the first configured one."""
+    tenants = get_tenants()
+    tid = st.session_state.get("tenant_id")
+    return tenants.get(tid) or tenants.get(DEFAULT_TENANT) or next(iter(tenants.values()))
+
+
+# --- Shared exporter (signed PDF + canonical JSON); one per tenant ---
+@st.cache_resource(max_entries=TENANT_CACHE_MAX, on_release=lambda service: service.close())
+def get_exporter(tenant_id: str = DEFAULT_TENANT):
+    from export import ExportService, Signer
+    tenants = get_tenants()
+    tenant = tenants.get(tenant_id) or next(iter(tenants.values()))
+    return ExportService(Signer.from_file(), compliance_label=tenant.compliance_label)
+
+
+# --- Shared audit trail (append-only, hash-chained, group-committed); one per tenant ---
+# Not evicted: a second writer on the same directory would fork the hash chain.
+@st.cache_resource
+def get_audit_log(tenant_id: str = DEFAULT_TENANT):
+    from audit import AuditLog
+    base = Path(os.environ.get("AUDIT_DIR", Path(__file__).resolve().parent / ".audit"))
+    return AuditLog(base / tenant_id)
+
+
+# --- Shared KPI engine (incremental rollups over case events); one per tenant ---
+@st.cache_resource(max_entries=TENANT_CACHE_MAX)
+def get_kpi_engine(tenant_id: str = DEFAULT_TENANT):
+    from kpis import KPIEngine
+    return KPIEngine()
+
+
+# --- Shared payer knowledge graph (insurer rules, plans, benefits); one per tenant ---
+@st.cache_resource(max_entries=TENANT_CACHE_MAX)
+def get_knowledge_graph(tenant_id: str = DEFAULT_TENANT):
+    from knowledge_graph import PayerKnowledgeGraph
+    tenants = get_tenants()
+    tenant = tenants.get(tenant_id) or next(iter(tenants.values()))
+    return PayerKnowledgeGraph.from_tenant(tenant, [tenant.knowledge_graph] if tenant.knowledge_graph else [])
+
+
+# --- Shared attachment ingestion (process pool + text cache by file hash); one per tenant ---
+@st.cache_resource(max_entries=TENANT_CACHE_MAX, on_release=lambda ingestor: ingestor.close())
+def get_ingestor(tenant_id: str = DEFAULT_TENANT):
+    from ingest import CACHE_DIR, AttachmentIngestor
+    return AttachmentIngestor(CACHE_DIR / tenant_id, max_workers=int(os.environ.get("INGEST_WORKERS", "0")) or None)
+
+
+# --- Shared telemetry (resource sampler, per-step latency/tokens/cost, Prometheus export) ---
+@st.cache_resource
+def get_telemetry():
+    from telemetry import Telemetry
+    telemetry = Telemetry.from_env().start()
+    port = int(os.environ.get("TELEMETRY_PORT", "0"))
+    if port:
+        telemetry.serve(port, host=os.environ.get("TELEMETRY_HOST", "127.0.0.1"))
+    return telemetry
+
+
+# --- Shared tool registry (pools and memo cache shared across sessions and tenants) ---
+@st.cache_resource
+def get_tool_registry():
+    from step4_tools import build_registry
+    return build_registry()
+
+
+# -----------------------------
+# Memory limit & eviction
+# -----------------------------
+_EVICTABLE = (get_exporter, get_kpi_engine, get_knowledge_graph, get_ingestor)
+
+
+def evict_tenant(tenant_id: str) -> None:
+    """Drop a tenant's evictable cached resources (they are rebuilt on next use)."""
+    for getter in _EVICTABLE:
+        getter.clear(tenant_id)
+    with _recent_lock:
+        _recent.pop(tenant_id, None)
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Resident set size in MiB of `pid` (default: this process) via psutil, else /proc; None if unavailable."""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 2**20
+    except ImportError:
+        pass
+    except psutil.Error:
+        return None
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def touch_tenant(tenant_id: str) -> Optional[str]:
+    """
+    Mark a tenant as active and enforce TENANT_MEMORY_LIMIT_MB. Returns the id
+    of the tenant evicted in this call, if any (never the active one).
+    """
+    with _recent_lock:
+        _recent[tenant_id] = None
+        _recent.move_to_end(tenant_id)
+        victim = next(iter(_recent)) if len(_recent) > 1 else None
+    if not TENANT_MEMORY_LIMIT_MB or victim is None:
+        return None
+    rss = rss_mb()
+    if rss is None or rss <= TENANT_MEMORY_LIMIT_MB:
+        return None
+    evict_tenant(victim)
+    return victim
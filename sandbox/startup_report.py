@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup-time report: cold import cost of each page of the Streamlit app.
+
+Every page is imported in a fresh interpreter (after `import streamlit`, which
+every session pays anyway), so the numbers are what a cold container pays on
+the first visit to that page. `-X importtime` attributes the cost to the
+heaviest packages (cumulative, so nested packages overlap).
+
+Usage (from the sandbox directory):
+    python startup_report.py
+    python startup_report.py --repeat 5 --top 5 --out bench/startup.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from views import PAGES
+
+BASE = Path(__file__).resolve().parent
+
+_PROBE = """
+import time
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+import importlib
+importlib.import_module({module!r})
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def _probe(module: str, importtime: bool = False) -> Tuple[float, float, str]:
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _PROBE.format(module=module)]
+    proc = subprocess.run(cmd, cwd=BASE, capture_output=True, text=True, check=True)
+    base_s, page_s = map(float, proc.stdout.split()[-2:])
+    return base_s, page_s, proc.stderr
+
+
+def heaviest_modules(importtime_log: str, top: int) -> List[Tuple[str, float]]:
+    """Packages imported by the page (not by streamlit), by cumulative import time in ms."""
+    cumulative: Dict[str, float] = {}
+    seen_streamlit = False
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cum, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cum.isdigit():
+            continue  # header line
+        if name == "streamlit":
+            seen_streamlit = True  # everything above was pulled in by streamlit itself
+        elif seen_streamlit and "." not in name and name != "views":
+            cumulative[name] = int(cum) / 1000.0
+    return sorted(cumulative.items(), key=lambda kv: -kv[1])[:top]
+
+
+def report(repeat: int = 3, top: int = 3) -> Dict[str, Any]:
+    pages, base = {}, []
+    for label, module in PAGES.items():
+        samples = [_probe(f"views.{module}") for _ in range(repeat)]
+        base += [s[0] for s in samples]
+        _, _, log = _probe(f"views.{module}", importtime=True)
+        pages[label] = {
+            "module": f"views.{module}",
+            "import_ms": statistics.median(s[1] for s in samples) * 1e3,
+            "heaviest": heaviest_modules(log, top),
+        }
+    return {
+        "meta": {"created_at": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+                 "repeat": repeat},
+        "streamlit_import_ms": statistics.median(base) * 1e3,
+        "pages": pages,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters per page (median is reported)")
+    ap.add_argument("--top", type=int, default=3, help="heaviest imported packages to list per page")
+    ap.add_argument("--out", type=Path, help="write the report JSON here")
+    args = ap.parse_args(argv)
+
+    rep = report(args.repeat, args.top)
+    print(f"{'import streamlit':28s} {rep['streamlit_import_ms']:8.1f} ms   (paid once per process)")
+    for label, r in rep["pages"].items():
+        heavy = ", ".join(f"{name} {ms:.0f} ms" for name, ms in r["heaviest"])
+        print(f"{label:28s} {r['import_ms']:8.1f} ms   {heavy}")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(rep, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Step-4 tools ("templates, validators") used by the Playground checklist.
+Each tool is registered on a `ToolRegistry` with a pydantic argument schema;
+`run_step4` fans them out in one parallel batch.
+"""
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from tool_registry import ToolCall, ToolRegistry
+
+# Generic attachments every insurer asks for (mirrors the Playground checklist)
+BASE_ATTACHMENTS = [
+    "Medical order / discharge summary",
+    "Signed clinical report (PDF)",
+    "Supporting tests (if applicable)",
+    "Insurer-specific certificates/templates",
+]
+
+# Extra attachments by trigger keyword (illustrative placeholder rules)
+TRIGGER_ATTACHMENTS = {
+    "surgery": ["Operative report"],
+    "hospital": ["Admission and discharge dates"],
+    "sick leave": ["Work incapacity certificate"],
+    "therapy": ["Treatment plan and session log"],
+}
+
+_DATE_RE = re.compile(r"^\s*(\d{4}-\d{2}-\d{2})\s*:")
+
+
+# -----------------------------
+# Argument schemas
+# -----------------------------
+class AttachmentsArgs(BaseModel):
+    insurer: str = Field("", description="Insurance company name")
+    trigger: str = Field("", description="Medical act that triggers the benefit")
+    base_attachments: Optional[List[str]] = Field(None, description="Tenant/insurer override of the generic attachments")
+    trigger_attachments: Optional[Dict[str, List[str]]] = Field(
+        None, description="Tenant/insurer override of the extra attachments by trigger keyword")
+
+
+class EvolutionArgs(BaseModel):
+    evolution: str = Field("", description="Clinical changes, one 'YYYY-MM-DD: text' entry per line or ';'")
+
+
+class RequiredFieldsArgs(BaseModel):
+    fields: Dict[str, Optional[str]] = Field(default_factory=dict, description="Form field name → value")
+
+
+# -----------------------------
+# Tools (short, pure-Python checks; run on the registry's thread pool)
+# -----------------------------
+def required_attachments(insurer: str, trigger: str, base_attachments: Optional[List[str]] = None,
+                         trigger_attachments: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """Attachments required by the insurer for the given medical act (tenant rules override the defaults)."""
+    t = trigger.lower()
+    by_trigger = TRIGGER_ATTACHMENTS if trigger_attachments is None else trigger_attachments
+    extras = [a for key, items in by_trigger.items() if key in t for a in items]
+    return list(BASE_ATTACHMENTS if base_attachments is None else base_attachments) + extras
+
+
+def validate_evolution(evolution: str) -> Dict[str, Any]:
+    """Check that each evolution entry starts with a valid ISO date, in chronological order."""
+    entries = [e.strip() for ln in evolution.splitlines() for e in ln.split(";") if e.strip()]
+    issues: List[str] = []
+    last: Optional[date] = None
+    for entry in entries:
+        m = _DATE_RE.match(entry)
+        if not m:
+            issues.append(f"Missing 'YYYY-MM-DD:' prefix: {entry[:40]}")
+            continue
+        try:
+            d = date.fromisoformat(m.group(1))
+        except ValueError:
+            issues.append(f"Invalid date: {m.group(1)}")
+            continue
+        if last and d < last:
+            issues.append(f"Out of order: {m.group(1)}")
+        last = d
+    return {"entries": len(entries), "issues": issues, "ok": bool(entries) and not issues}
+
+
+def check_required_fields(fields: Dict[str, Optional[str]]) -> List[str]:
+    """Names of required form fields that are still empty."""
+    return [k for k, v in fields.items() if not (v or "").strip()]
+
+
+def build_registry(registry: Optional[ToolRegistry] = None) -> ToolRegistry:
+    reg = registry or ToolRegistry()
+    reg.tool(AttachmentsArgs, pure=True, timeout=5.0)(required_attachments)
+    reg.tool(EvolutionArgs, pure=True, timeout=5.0)(validate_evolution)
+    reg.tool(RequiredFieldsArgs, pure=True, timeout=2.0)(check_required_fields)
+    return reg
+
+
+def run_step4(registry: ToolRegistry, *, insurer: str, trigger: str, diagnosis: str,
+              professional: str, evolution: str, rules: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run all step-4 tools in one parallel batch; returns {tool name: ToolResult}.
+    `rules` (tenant attachment rules, see TenantConfig.rules_for) become tool
+    arguments, so the shared memo cache never mixes tenants.
+    """
+    calls = [
+        ToolCall("required_attachments", {"insurer": insurer, "trigger": trigger, **(rules or {})}),
+        ToolCall("validate_evolution", {"evolution": evolution}),
+        ToolCall("check_required_fields", {"fields": {
+            "Insurance company": insurer,
+            "Medical Act (trigger)": trigger,
+            "Primary diagnosis / reason": diagnosis,
+            "Responsible clinician": professional,
+        }}),
+    ]
+    return {r.name: r for r in registry.invoke_many(calls)}
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resource and cost telemetry for agent runs.
+
+- Steps: `with telemetry.step("step4.tools", run_id=case_id):` times a flow
+  step (wall time and the CPU time of the thread running it, so concurrent
+  sessions are not charged for each other) and collects the tokens and cost
+  of the LLM calls made inside it.
+- LLM calls: `telemetry.callback()` is a LangChain callback handler that
+  records latency, input/output tokens (usage_metadata or llm_output) and
+  cost (`prices`, USD per 1k tokens) for each call. It attributes the call to
+  the enclosing step, or to `metadata={"step": ...}` in the run config.
+- Resources: a daemon thread samples process CPU %, RSS and thread count
+  every `sample_interval` seconds. A sample is one psutil call (or
+  /proc/self/statm), and the sampler keeps track of its own cost.
+
+Recent samples and step/call records are kept in ring buffers (`capacity`
+entries each). Aggregates (counters and latency histograms per step and
+model) are exported as Prometheus text or OpenMetrics: to a file
+(`export_path`, rewritten atomically every `export_interval` seconds, e.g.
+for node_exporter's textfile collector) and/or over HTTP (`serve(port)`,
+GET /metrics).
+
+Demo (fake chat model, no network):
+    python telemetry.py --runs 40 --concurrency 8 --out agent_metrics.prom
+"""
+from __future__ import annotations
+
+import argparse
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:  # without LangChain: resource sampling and step timing only
+    BaseCallbackHandler = object
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+Price = Union[float, Tuple[float, float]]  # USD per 1k tokens: one rate, or (input, output)
+
+
+# -----------------------------
+# Records
+# -----------------------------
+@dataclass
+class ResourceSample:
+    ts: float
+    cpu_percent: float       # process CPU since the previous sample (100 = one core)
+    rss_bytes: int
+    threads: int
+
+
+@dataclass
+class StepRecord:
+    ts: float
+    kind: str                # "step" | "llm"
+    step: str
+    run_id: Optional[str]
+    latency_s: float
+    model: str = ""
+    cpu_s: float = 0.0       # CPU time of the step's thread (work handed to pools is not included)
+    rss_bytes: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    ok: bool = True
+
+
+@dataclass
+class _Aggregate:
+    count: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    cpu_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, rec: StepRecord) -> None:
+        self.count += 1
+        self.errors += 0 if rec.ok else 1
+        self.latency_sum += rec.latency_s
+        for i, le in enumerate(LATENCY_BUCKETS):
+            if rec.latency_s <= le:
+                self.buckets[i] += 1
+        self.cpu_s += rec.cpu_s
+        self.input_tokens += rec.input_tokens
+        self.output_tokens += rec.output_tokens
+        self.cost_usd += rec.cost_usd
+
+
+class StepScope:
+    """The step being timed; LLM calls inside it add their tokens and cost here."""
+
+    def __init__(self, name: str, run_id: Optional[str]):
+        self.name, self.run_id = name, run_id
+        self.input_tokens = self.output_tokens = 0
+        self.cost_usd = 0.0
+        self._lock = threading.Lock()
+
+    def add_usage(self, input_tokens: int, output_tokens: int, cost_usd: float) -> None:
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cost_usd += cost_usd
+
+
+_current_step: contextvars.ContextVar[Optional[StepScope]] = contextvars.ContextVar("telemetry_step", default=None)
+
+
+# -----------------------------
+# Process resources
+# -----------------------------
+def _process():
+    try:
+        import psutil
+        return psutil.Process()
+    except ImportError:
+        return None
+
+
+def _rss_bytes(proc) -> int:
+    if proc is not None:
+        return proc.memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+# -----------------------------
+# Telemetry
+# -----------------------------
+class Telemetry:
+    def __init__(self, *, capacity: int = 4096, sample_interval: float = 1.0,
+                 prices: Optional[Mapping[str, Price]] = None, export_path: Optional[Union[str, Path]] = None,
+                 export_interval: float = 15.0, openmetrics: bool = False, namespace: str = "agent"):
+        self.samples: Deque[ResourceSample] = deque(maxlen=capacity)
+        self.records: Deque[StepRecord] = deque(maxlen=capacity)
+        self.sample_interval = sample_interval
+        self.prices: Dict[str, Price] = dict(prices or {})
+        self.export_path = Path(export_path) if export_path else None
+        self.export_interval = export_interval
+        self.openmetrics = openmetrics
+        self.namespace = namespace
+        self.sampler_cpu_s = 0.0               # CPU spent by the sampler itself
+        self.started_at = time.time()
+        self._aggs: Dict[Tuple[str, str, str], _Aggregate] = {}   # (kind, step, model)
+        self._lock = threading.Lock()
+        self._proc = _process()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._servers: List[ThreadingHTTPServer] = []
+        self._cpu_mark = (time.monotonic(), time.process_time())
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "Telemetry":
+        """Settings from TELEMETRY_FILE, TELEMETRY_INTERVAL and TELEMETRY_OPENMETRICS (1 → OpenMetrics)."""
+        env = os.environ
+        return cls(
+            sample_interval=float(env.get("TELEMETRY_INTERVAL", "1.0")),
+            export_path=env.get("TELEMETRY_FILE") or None,
+            openmetrics=env.get("TELEMETRY_OPENMETRICS", "0") == "1",
+            **kwargs,
+        )
+
+    # --- lifecycle ---
+    def start(self) -> "Telemetry":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="telemetry-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.sample_interval + 5)
+        self.sample()  # final reading, so short runs still export resource gauges
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+        if self.export_path is not None:
+            self.write(self.export_path)
+
+    def __enter__(self) -> "Telemetry":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        next_export = time.monotonic() + self.export_interval
+        while not self._stop.wait(self.sample_interval):
+            self.sample()
+            if self.export_path is not None and time.monotonic() >= next_export:
+                try:
+                    self.write(self.export_path)
+                except OSError:
+                    pass  # next interval retries; metrics stay in memory
+                next_export = time.monotonic() + self.export_interval
+
+    def sample(self) -> ResourceSample:
+        """Take one resource sample (the sampler thread calls this every `sample_interval`)."""
+        t0 = time.thread_time()
+        rss = _rss_bytes(self._proc)
+        with self._lock:  # the sampler thread, stop() and callers may sample concurrently
+            now, cpu = time.monotonic(), time.process_time()
+            last_now, last_cpu = self._cpu_mark
+            self._cpu_mark = (now, cpu)
+            pct = 100.0 * (cpu - last_cpu) / (now - last_now) if now > last_now else 0.0
+            s = ResourceSample(time.time(), round(pct, 1), rss, threading.active_count())
+            self.samples.append(s)
+            self.sampler_cpu_s += time.thread_time() - t0
+        return s
+
+    # --- recording ---
+    @contextmanager
+    def step(self, name: str, run_id: Optional[str] = None) -> Iterator[StepScope]:
+        """Time a flow step; LLM calls made inside it (same thread or copied context) are attributed to it."""
+        scope = StepScope(name, run_id)
+        token = _current_step.set(scope)
+        t0, cpu0, ok = time.perf_counter(), time.thread_time(), True
+        try:
+            yield scope
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            _current_step.reset(token)
+            self.record(StepRecord(
+                ts=time.time(), kind="step", step=name, run_id=run_id, latency_s=time.perf_counter() - t0,
+                cpu_s=time.thread_time() - cpu0, rss_bytes=_rss_bytes(self._proc),
+                input_tokens=scope.input_tokens, output_tokens=scope.output_tokens, cost_usd=scope.cost_usd, ok=ok,
+            ))
+
+    def record(self, rec: StepRecord) -> None:
+        with self._lock:
+            self.records.append(rec)
+            self._aggs.setdefault((rec.kind, rec.step, rec.model), _Aggregate()).add(rec)
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        """USD for a call (`prices` per 1k tokens; unknown models cost 0)."""
+        price = self.prices.get(model, 0.0)
+        p_in, p_out = price if isinstance(price, tuple) else (price, price)
+        return (input_tokens * p_in + output_tokens * p_out) / 1000.0
+
+    def callback(self) -> "TelemetryCallbackHandler":
+        return TelemetryCallbackHandler(self)
+
+    # --- reading ---
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per step (from the ring buffer): count, errors, p50/p95 latency, CPU, tokens and cost."""
+        by_step: Dict[str, List[StepRecord]] = {}
+        with self._lock:
+            for rec in self.records:
+                if rec.kind == "step":
+                    by_step.setdefault(rec.step, []).append(rec)
+        out = {}
+        for name, recs in by_step.items():
+            lat = sorted(r.latency_s for r in recs)
+            out[name] = {
+                "count": len(recs),
+                "errors": sum(not r.ok for r in recs),
+                "p50_ms": round(1000 * lat[len(lat) // 2], 2),
+                "p95_ms": round(1000 * lat[min(len(lat) - 1, int(0.95 * len(lat)))], 2),
+                "cpu_s": round(sum(r.cpu_s for r in recs), 4),
+                "tokens": sum(r.input_tokens + r.output_tokens for r in recs),
+                "cost_usd": round(sum(r.cost_usd for r in recs), 6),
+            }
+        return out
+
+    # --- export ---
+    def render(self, openmetrics: Optional[bool] = None) -> str:
+        """Aggregates and the latest resource sample in Prometheus text (or OpenMetrics) format."""
+        om = self.openmetrics if openmetrics is None else openmetrics
+        ns = self.namespace
+        with self._lock:
+            aggs = {k: (a.count, a.errors, a.latency_sum, list(a.buckets), a.cpu_s,
+                        a.input_tokens, a.output_tokens, a.cost_usd) for k, a in self._aggs.items()}
+        last = self.samples[-1] if self.samples else None
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_: str, samples: List[Tuple[str, Dict[str, str], float]]) -> None:
+            typed = f"{name}_total" if kind == "counter" and not om else name
+            lines.append(f"# HELP {typed} {help_}")
+            lines.append(f"# TYPE {typed} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_labels(labels)} {_num(value)}")
+
+        if last is not None:
+            family(f"{ns}_process_cpu_percent", "gauge", "Process CPU over the last sample interval (100 = one core).",
+                   [("", {}, last.cpu_percent)])
+            family(f"{ns}_process_resident_memory_bytes", "gauge", "Process resident set size.",
+                   [("", {}, last.rss_bytes)])
+            family(f"{ns}_process_threads", "gauge", "Live Python threads.", [("", {}, last.threads)])
+        family(f"{ns}_telemetry_sampler_cpu_seconds", "counter", "CPU time spent by the telemetry sampler.",
+               [("_total", {}, self.sampler_cpu_s)])
+
+        for kind, label_keys in (("step", ("step",)), ("llm", ("step", "model"))):
+            rows = [(dict(zip(("step", "model"), (step, model))), v)
+                    for (k, step, model), v in sorted(aggs.items()) if k == kind]
+            rows = [({lk: labels[lk] for lk in label_keys}, v) for labels, v in rows]
+            if not rows:
+                continue
+            base = f"{ns}_{kind}"
+            hist: List[Tuple[str, Dict[str, str], float]] = []
+            for labels, (count, _, lat_sum, buckets, *_rest) in rows:
+                hist += [("_bucket", {**labels, "le": _num(le)}, n) for le, n in zip(LATENCY_BUCKETS, buckets)]
+                hist += [("_bucket", {**labels, "le": "+Inf"}, count), ("_sum", labels, lat_sum), ("_count", labels, count)]
+            family(f"{base}_duration_seconds", "histogram", f"{'Flow step' if kind == 'step' else 'LLM call'} latency.", hist)
+            family(f"{base}_errors", "counter", "Failed executions.", [("_total", l, v[1]) for l, v in rows])
+            if kind == "step":
+                family(f"{base}_cpu_seconds", "counter", "CPU time of the thread running the step.",
+                       [("_total", l, v[4]) for l, v in rows])
+            family(f"{base}_tokens", "counter", "LLM tokens.",
+                   [("_total", {**l, "direction": d}, v[5 if d == "input" else 6]) for l, v in rows
+                    for d in ("input", "output")])
+            family(f"{base}_cost_usd", "counter", "LLM cost in USD (configured prices).",
+                   [("_total", l, v[7]) for l, v in rows])
+        if om:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, Path], openmetrics: Optional[bool] = None) -> Path:
+        """Write the metrics atomically (temp file + rename), so scrapers never read a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(openmetrics), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve GET /metrics in a daemon thread (OpenMetrics if the scraper asks for it)."""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                om = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = telemetry.render(openmetrics=om).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8"
+                                 if om else "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="telemetry-http", daemon=True).start()
+        self._servers.append(server)
+        return server
+
+
+def _labels(labels: Mapping[str, Any]) -> str:
+    if not labels:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, esc)) + "}"
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# -----------------------------
+# LangChain callback
+# -----------------------------
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """
+    Records each LLM / chat model call (latency, tokens, cost) into a Telemetry.
+    Drop-in next to (or instead of) UsageMetadataCallbackHandler: pass it in
+    `callbacks=[...]` at model construction or in the invoke config.
+    """
+
+    raise_error = False
+    run_inline = True          # keep the caller's context, so the enclosing step is visible
+
+    def __init__(self, telemetry: Telemetry):
+        self.telemetry = telemetry
+        self._runs: Dict[uuid.UUID, Tuple[float, str, Optional[StepScope], str]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: uuid.UUID, serialized: Optional[Dict[str, Any]], metadata: Optional[Dict[str, Any]],
+               kwargs: Dict[str, Any]) -> None:
+        params = kwargs.get("invocation_params") or {}
+        metadata = metadata or {}
+        model = (metadata.get("ls_model_name") or params.get("model") or params.get("model_name")
+                 or (serialized or {}).get("name") or "unknown")
+        scope = _current_step.get()
+        step = scope.name if scope is not None else str(metadata.get("step", "unscoped"))
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), str(model), scope, step)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._start(run_id, serialized, metadata, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None,
+                            **kwargs):
+        self._start(run_id, serialized, metadata, kwargs)
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, response, ok=True)
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, None, ok=False)
+
+    def _end(self, run_id: uuid.UUID, response: Any, ok: bool) -> None:
+        with self._lock:
+            started = self._runs.pop(run_id, None)
+        if started is None:
+            return
+        t0, model, scope, step = started
+        in_tok, out_tok = _usage(response) if response is not None else (0, 0)
+        cost = self.telemetry.cost(model, in_tok, out_tok)
+        if scope is not None:
+            scope.add_usage(in_tok, out_tok, cost)
+        self.telemetry.record(StepRecord(
+            ts=time.time(), kind="llm", step=step, run_id=scope.run_id if scope else None,
+            latency_s=time.perf_counter() - t0, model=model,
+            input_tokens=in_tok, output_tokens=out_tok, cost_usd=cost, ok=ok,
+        ))
+
+
+def _usage(response: Any) -> Tuple[int, int]:
+    """(input, output) tokens of an LLMResult: message usage_metadata, else llm_output['token_usage']."""
+    in_tok = out_tok = 0
+    found = False
+    for gens in getattr(response, "generations", None) or []:
+        for gen in gens:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if usage:
+                found = True
+                in_tok += usage.get("input_tokens", 0)
+                out_tok += usage.get("output_tokens", 0)
+    if not found:
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        in_tok, out_tok = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return in_tok, out_tok
+
+
+# -----------------------------
+# Demo
+# -----------------------------
+def _fake_chat_model(latency: float):
+    """Chat model with a fixed latency that reports usage_metadata (like a real provider)."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class FakeChat(BaseChatModel):
+        model: str = "fake-mini"
+
+        @property
+        def _llm_type(self) -> str:
+            return "fake-chat"
+
+        @property
+        def _identifying_params(self) -> Dict[str, Any]:
+            return {"model": self.model}
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(latency)
+            text = " ".join(str(m.content) for m in messages)
+            n_in, n_out = max(1, len(text) // 4), 48
+            msg = AIMessage(content="Draft: " + text[:40],
+                            usage_metadata={"input_tokens": n_in, "output_tokens": n_out, "total_tokens": n_in + n_out})
+            return ChatResult(generations=[ChatGeneration(message=msg)])
+
+    return FakeChat()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Per-step latency / tokens / cost telemetry over simulated agent runs.")
+    ap.add_argument("--runs", type=int, default=40)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per call (s)")
+    ap.add_argument("--interval", type=float, default=0.1, help="resource sampling interval (s)")
+    ap.add_argument("--out", default=None, help="write metrics to this file")
+    ap.add_argument("--openmetrics", action="store_true")
+    ap.add_argument("--serve", type=int, default=0, help="serve /metrics on this port until Ctrl-C")
+    args = ap.parse_args(argv)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from step4_tools import build_registry, run_step4
+
+    telemetry = Telemetry(sample_interval=args.interval, prices={"fake-mini": (0.00015, 0.0006)},
+                          openmetrics=args.openmetrics).start()
+    llm = _fake_chat_model(args.latency).with_config(callbacks=[telemetry.callback()])
+    registry = build_registry()
+
+    def run(i: int) -> None:
+        case = f"case-{i}"
+        with telemetry.step("step4.tools", run_id=case):
+            run_step4(registry, insurer="SaludPlus", trigger="outpatient surgery", diagnosis="lumbosciatica",
+                      professional="Dr. Demo", evolution=f"2025-09-{i % 28 + 1:02d}: physiotherapy started")
+        with telemetry.step("step5.draft", run_id=case):
+            llm.invoke(f"Draft the report for {case}: outpatient surgery, lumbosciatica, physiotherapy started")
+        with telemetry.step("step6.review", run_id=case):
+            llm.invoke(f"Review the draft for {case} against the insurer checklist")
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run, range(args.runs)))
+    elapsed = time.perf_counter() - t0
+    telemetry.sample()
+    registry.shutdown()
+
+    print(json.dumps({
+        "runs": args.runs, "seconds": round(elapsed, 3),
+        "steps": telemetry.summary(),
+        "samples": len(telemetry.samples),
+        "peak_rss_mb": round(max(s.rss_bytes for s in telemetry.samples) / 2**20, 1),
+        "sampler_cpu_ms": round(1000 * telemetry.sampler_cpu_s, 2),
+        "last_sample": asdict(telemetry.samples[-1]),
+    }, indent=2))
+    if args.out:
+        print(f"metrics → {telemetry.write(args.out)}")
+    if args.serve:
+        telemetry.serve(args.serve)
+        print(f"serving http://127.0.0.1:{args.serve}/metrics (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    telemetry.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tenant configuration for multi-tenant deployments (one app process serving
+several insurers / clinics).
+
+A tenant has its own insurer templates and rules (required attachments per
+insurer and trigger), compliance label, icon set and, optionally, a payer
+knowledge graph file with plans and benefits (see knowledge_graph.py).
+Tenants are read from a YAML or JSON file (`TENANTS_FILE`, default
+`sandbox/tenants.yaml`); without one, the built-in "default" tenant
+reproduces the single-audience demo.
+
+File format (see tenants.example.yaml):
+    tenants:
+      acme-clinic:
+        name: ACME Clinic
+        compliance_label: HIPAA
+        icons_dir: assets/icons          # relative to the tenants file
+        knowledge_graph: payer_kg.ttl    # optional; relative to the tenants file
+        base_attachments: [...]          # optional; step-4 defaults otherwise
+        trigger_attachments: {surgery: [Operative report]}
+        insurers:                        # per-insurer overrides of the two lists above
+          SaludPlus:
+            trigger_attachments: {therapy: [Prescription with session count]}
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+DEFAULT_TENANT = "default"
+DEFAULT_COMPLIANCE_LABEL = "HIPAA / GDPR"
+TENANTS_FILE = Path(os.environ.get("TENANTS_FILE", Path(__file__).resolve().parent / "tenants.yaml"))
+
+
+@dataclass
+class TenantConfig:
+    tenant_id: str
+    name: str
+    compliance_label: str = DEFAULT_COMPLIANCE_LABEL
+    icons_dir: Optional[Path] = None                           # None → app default icons
+    knowledge_graph: Optional[Path] = None                     # Turtle/N-Triples with plans, benefits, rules
+    base_attachments: Optional[List[str]] = None               # None → step-4 defaults
+    trigger_attachments: Optional[Dict[str, List[str]]] = None
+    insurers: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def rules_for(self, insurer: str) -> Dict[str, Any]:
+        """Attachment rules for an insurer (case-insensitive name), as step-4 tool arguments."""
+        override = next((v for k, v in self.insurers.items() if k.lower() == insurer.strip().lower()), {})
+        triggers = None
+        if self.trigger_attachments is not None or "trigger_attachments" in override:
+            triggers = {**(self.trigger_attachments or {}), **override.get("trigger_attachments", {})}
+        return {
+            "base_attachments": override.get("base_attachments", self.base_attachments),
+            "trigger_attachments": triggers,
+        }
+
+
+def _str_list(value: Any, where: str) -> List[str]:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{where}: expected a list of strings")
+    return value
+
+
+def _triggers(value: Any, where: str) -> Dict[str, List[str]]:
+    if not isinstance(value, Mapping):
+        raise ValueError(f"{where}: expected a mapping of trigger keyword → list of attachments")
+    return {str(k).lower(): _str_list(v, f"{where}.{k}") for k, v in value.items()}
+
+
+def parse_tenants(raw: Mapping[str, Any], base_dir: Path = Path(".")) -> Dict[str, TenantConfig]:
+    """Build TenantConfig objects from the parsed file; raises ValueError on malformed entries."""
+    tenants: Dict[str, TenantConfig] = {}
+    for tid, cfg in (raw.get("tenants") or {}).items():
+        cfg = cfg or {}
+        where = f"tenants.{tid}"
+        insurers = {}
+        for name, rules in (cfg.get("insurers") or {}).items():
+            rules = rules or {}
+            entry: Dict[str, Any] = {}
+            if "base_attachments" in rules:
+                entry["base_attachments"] = _str_list(rules["base_attachments"], f"{where}.insurers.{name}.base_attachments")
+            if "trigger_attachments" in rules:
+                entry["trigger_attachments"] = _triggers(rules["trigger_attachments"], f"{where}.insurers.{name}.trigger_attachments")
+            insurers[str(name)] = entry
+        icons_dir = cfg.get("icons_dir")
+        kg_file = cfg.get("knowledge_graph")
+        tenants[str(tid)] = TenantConfig(
+            tenant_id=str(tid),
+            name=str(cfg.get("name") or tid),
+            compliance_label=str(cfg.get("compliance_label") or DEFAULT_COMPLIANCE_LABEL),
+            icons_dir=(base_dir / icons_dir).resolve() if icons_dir else None,
+            knowledge_graph=(base_dir / kg_file).resolve() if kg_file else None,
+            base_attachments=_str_list(cfg["base_attachments"], f"{where}.base_attachments")
+            if "base_attachments" in cfg else None,
+            trigger_attachments=_triggers(cfg["trigger_attachments"], f"{where}.trigger_attachments")
+            if "trigger_attachments" in cfg else None,
+            insurers=insurers,
+        )
+    return tenants
+
+
+def load_tenants(path: Path = TENANTS_FILE) -> Dict[str, TenantConfig]:
+    """Tenants from a YAML/JSON file, or only the built-in default tenant if the file does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return {DEFAULT_TENANT: TenantConfig(DEFAULT_TENANT, "Demo")}
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        import yaml
+        raw = yaml.safe_load(text) or {}
+    else:
+        raw = json.loads(text)
+    tenants = parse_tenants(raw, path.parent)
+    if not tenants:
+        raise ValueError(f"{path}: no tenants defined")
+    return tenants
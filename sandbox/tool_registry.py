@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Typed tool registry for the agent "Tools" capability (flow step 4).
+
+Tools are plain functions described by a pydantic model for their arguments.
+Independent calls run in parallel on a shared thread pool. The registry lives
+inside the multi-threaded Streamlit server, where forking is unsafe and spawned
+workers re-run the app script, so it has no process pool: heavy CPU work
+belongs in a service that owns its pool (ingest.py, export.py). Pure tools are
+memoized by a hash of their validated arguments (callers always get their own
+copy of a result), and every call is bounded by its tool's timeout, so a batch
+of step-4 calls takes roughly as long as its slowest member.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+
+# -----------------------------
+# Tool metadata & results
+# -----------------------------
+@dataclass
+class ToolSpec:
+    name: str
+    func: Callable[..., Any]
+    args_model: Type[BaseModel]       # pydantic schema for the call arguments
+    description: str = ""
+    pure: bool = False                # same arguments → same result (safe to memoize)
+    timeout: float = 10.0             # seconds
+
+
+@dataclass
+class ToolCall:
+    name: str
+    args: Dict[str, Any]
+
+
+@dataclass
+class ToolResult:
+    name: str
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    cached: bool = False
+
+
+def args_hash(name: str, args: BaseModel) -> str:
+    """Stable hash of a tool name and its validated arguments (canonical JSON)."""
+    payload = json.dumps(args.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{name}:{payload}".encode("utf-8")).hexdigest()
+
+
+def _call(func: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+    return func(**kwargs)
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+class ToolRegistry:
+    """Registry + executor for agent tools. Safe to share across sessions."""
+
+    def __init__(self, max_threads: int = 8, cache_size: int = 512):
+        self._tools: Dict[str, ToolSpec] = {}
+        self._max_threads = max_threads
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    # --- registration ---
+    def register(self, spec: ToolSpec) -> ToolSpec:
+        self._tools[spec.name] = spec
+        return spec
+
+    def tool(self, args_model: Type[BaseModel], *, name: Optional[str] = None, pure: bool = False, timeout: float = 10.0, description: Optional[str] = None):
+        """Decorator form of `register`; the function itself is returned unchanged."""
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            self.register(ToolSpec(
+                name=name or func.__name__,
+                func=func,
+                args_model=args_model,
+                description=description or (func.__doc__ or "").strip(),
+                pure=pure,
+                timeout=timeout,
+            ))
+            return func
+        return decorator
+
+    def get(self, name: str) -> ToolSpec:
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise KeyError(f"Unknown tool: {name}") from None
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Tool listing in MCP shape (name, description, inputSchema)."""
+        return [
+            {"name": s.name, "description": s.description, "inputSchema": s.args_model.model_json_schema()}
+            for s in self._tools.values()
+        ]
+
+    # --- memo cache (LRU); values are copied in and out, so callers can't mutate cached results ---
+    def _cache_get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                value = self._cache[key]
+            else:
+                return False, None
+        return True, copy.deepcopy(value)
+
+    def _cache_put(self, key: str, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    # --- execution ---
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self._max_threads, thread_name_prefix="tool")
+            return self._threads
+
+    def invoke(self, name: str, args: Dict[str, Any]) -> ToolResult:
+        return self.invoke_many([ToolCall(name, args)])[0]
+
+    def invoke_many(self, calls: Sequence[ToolCall]) -> List[ToolResult]:
+        """
+        Run independent calls concurrently and return results in input order.
+        Identical pure calls in the same batch share one execution (each slot
+        gets its own copy of the value). A call that exceeds its timeout is
+        reported as failed, but Python cannot kill its thread: it keeps a pool
+        slot until the function returns, so tools must finish on their own.
+        """
+        results: List[Optional[ToolResult]] = [None] * len(calls)
+        pending: Dict[str, Tuple[Future, ToolSpec, float, List[int]]] = {}
+        start = time.perf_counter()
+
+        for i, call in enumerate(calls):
+            try:
+                spec = self.get(call.name)
+                validated = spec.args_model.model_validate(call.args)
+            except (KeyError, ValidationError) as e:
+                results[i] = ToolResult(call.name, ok=False, error=f"{type(e).__name__}: {e}")
+                continue
+
+            key = args_hash(spec.name, validated) if spec.pure else f"{spec.name}#{i}"
+            if spec.pure:
+                hit, value = self._cache_get(key)
+                if hit:
+                    results[i] = ToolResult(spec.name, ok=True, value=value, cached=True)
+                    continue
+            if key in pending:
+                pending[key][3].append(i)
+                continue
+            kwargs = validated.model_dump()
+            future = self._executor().submit(_call, spec.func, kwargs)
+            pending[key] = (future, spec, start + spec.timeout, [i])
+
+        for key, (future, spec, deadline, slots) in pending.items():
+            try:
+                value = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+                if spec.pure:
+                    self._cache_put(key, value)
+                res = ToolResult(spec.name, ok=True, value=value)
+            except FutureTimeout:
+                future.cancel()
+                res = ToolResult(spec.name, ok=False, error=f"timed out after {spec.timeout:.1f}s")
+            except Exception as e:
+                res = ToolResult(spec.name, ok=False, error=f"{type(e).__name__}: {e}")
+            res.elapsed = time.perf_counter() - start
+            for n, i in enumerate(slots):
+                results[i] = res if n == 0 else replace(res, value=copy.deepcopy(res.value))
+
+        return [r for r in results if r is not None]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, None
+        if threads is not None:
+            threads.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,53 @@
+"""
+Pages of the Streamlit app, one module per page, imported on first visit.
+
+Each page module exposes `render()` and may expose `warm_up()`, which preloads
+its heavy dependencies without Streamlit calls (it runs on a background
+thread after the first page has been drawn).
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Dict, Iterable, Optional
+
+# Sidebar label → module in this package (order = navigation order)
+PAGES: Dict[str, str] = {
+    "Problem Statement": "problem",
+    "Solution & Key Roles": "solution",
+    "Architecture": "architecture",
+    "Architecture (Icons)": "icons",
+    "Flow (1–9)": "flow",
+    "Impact": "impact",
+    "Technology Stack": "stack",
+    "Playground": "playground",
+}
+
+
+def load_page(label: str) -> ModuleType:
+    """Import (once) and return the module behind a sidebar label."""
+    return importlib.import_module(f"{__name__}.{PAGES[label]}")
+
+
+def warm_up(labels: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """Import pages and run their `warm_up()` hooks; returns seconds per page."""
+    timings = {}
+    for label in labels if labels is not None else PAGES:
+        t0 = time.perf_counter()
+        try:
+            hook = getattr(load_page(label), "warm_up", None)
+            if hook:
+                hook()
+        except Exception:  # warm-up is best effort; the page reports errors when visited
+            continue
+        timings[label] = time.perf_counter() - t0
+    return timings
+
+
+def start_warm_up(labels: Optional[Iterable[str]] = None) -> threading.Thread:
+    """Run `warm_up()` on a daemon thread."""
+    thread = threading.Thread(target=warm_up, args=(labels,), name="pages-warm-up", daemon=True)
+    thread.start()
+    return thread
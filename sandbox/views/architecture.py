@@ -0,0 +1,66 @@
+"""Architecture page (Graphviz whiteboard diagram)."""
+from __future__ import annotations
+
+import streamlit as st
+
+from resources import current_tenant
+
+
+def render() -> None:
+    compliance = current_tenant().compliance_label
+    st.title("Proposed architecture (whiteboard → app)")
+    st.caption(f"Compliance boundary: {compliance}. The agent operates with supervision (human-in-the-loop).")
+
+    dot = r"""
+    digraph G {
+      rankdir=LR;
+      splines=spline;
+      fontname="Helvetica";
+
+      node [shape=box, style="rounded", fontsize=11, fontname="Helvetica"];
+      edge [fontsize=10, fontname="Helvetica"];
+
+      subgraph cluster_comp {
+        label="Compliance: HIPAA / GDPR";
+        color=red;
+
+        agent_profile [label="Agent Profile"];
+        agent [label="Agent\n(Orchestrator · Planning · 'Autonomous'*)"];
+        llm [label="LLM"];
+        system [label="System message"];
+        memory [label="Memory"];
+        knowledge [label="Knowledge"];
+        tools [label="Tools"];
+
+        # Internal relations
+        agent_profile -> agent [label="(2)"];
+        agent -> memory   [label="(4)"];
+        agent -> knowledge[label="(4)"];
+        agent -> tools    [label="(4)"];
+        agent -> llm      [label="(5)"];
+        llm   -> agent    [label="(6)"];
+        system-> agent    [label="(7)"];
+      }
+
+      # External actors
+      medical [label="Medical Act\n(trigger)"];
+      patient [label="Patient\nRequest"];
+      insurer [label="Health Insurance Company"];
+
+      # Inputs into boundary
+      medical -> agent_profile [label="(1)"];
+      patient -> agent_profile [label="(2)"];
+      insurer -> agent_profile [label="(3)"];
+
+      # Outputs / feedback
+      agent -> insurer [label="(8) Report/Status"];
+      insurer -> system [label="(8) Rules/Templates"];
+
+      # Human supervision
+      patient -> agent [style=dashed, label="(9) Human-in-the-loop"];
+    }
+    """
+    dot = dot.replace("HIPAA / GDPR", compliance.replace('"', "'"))  # tenant label
+    st.graphviz_chart(dot, use_container_width="stretch")
+
+    st.caption("(*) 'Autonomous' within guardrails and with human review.")
@@ -0,0 +1,21 @@
+"""Numbered flow (1–9) page."""
+from __future__ import annotations
+
+import streamlit as st
+
+
+def render() -> None:
+    st.title("Numbered flow (1–9)")
+    st.markdown(
+        """
+        1. **Medical Act (trigger):** a clinical event requires a report.\n
+        2. **Patient request:** benefits are requested; the Agent Profile captures case context.\n
+        3. **Insurer → Agent Profile:** sends rules, templates, and validation criteria.\n
+        4. **Agent uses Memory/Knowledge/Tools:** retrieves policies and utilities (e.g., templates, validators).\n
+        5. **Agent → LLM:** drafts/plans checklists and report content.\n
+        6. **LLM → Agent:** returns text/plan; the agent decides next steps.\n
+        7. **System message:** sets policies, tone, and limits during orchestration.\n
+        8. **Exchange with insurer:** submit reports/status; receive rules/observations.\n
+        9. **Human-in-the-loop:** clinician verifies/edits before sending; patient can follow status.
+        """
+    )
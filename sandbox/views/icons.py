@@ -0,0 +1,87 @@
+"""Architecture (Icons) page: responsive SVG with PNG icons."""
+from __future__ import annotations
+
+import base64
+import io
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from icons_svg import ICON_NAMES, ICON_SIZE, VH, build_icons_html
+from resources import current_tenant
+from tenants import load_tenants
+
+# --- Locate icons directory ---
+BASE = Path(__file__).resolve().parent.parent
+CANDIDATES = [
+    BASE / "assets" / "icons",
+    BASE / "sandbox" / "assets" / "icons",
+    BASE.parent / "assets" / "icons",
+    BASE.parent / "sandbox" / "assets" / "icons",
+]
+ICON_DIR = next((p for p in CANDIDATES if p.exists()), CANDIDATES[0])
+# Icons are drawn at ICON_SIZE px; 2x keeps them sharp on high-DPI screens
+ICON_PX = 2 * ICON_SIZE
+
+
+def _icon_png(path: Path) -> bytes:
+    """
+    The icon downscaled to fit ICON_PX and palette-encoded, since the page HTML
+    (icons inlined) is re-sent on every rerun; original bytes if unreadable.
+    """
+    from PIL import Image  # streamlit dependency
+    try:
+        with Image.open(path) as im:
+            im = im.convert("RGBA")
+            im.thumbnail((ICON_PX, ICON_PX))
+            buf = io.BytesIO()
+            # 256-colour palette (alpha kept): about a third of the RGBA size at this scale
+            im.quantize(256, method=Image.Quantize.FASTOCTREE).save(buf, format="PNG", optimize=True)
+            return buf.getvalue()
+    except OSError:
+        return path.read_bytes()
+
+
+@lru_cache(maxsize=32)
+def icon_data_uris(icon_dir: Path = ICON_DIR) -> Dict[str, str]:
+    """Return {name: data: URI (base64)} for every icon PNG in `icon_dir`; empty string if missing."""
+    out = {}
+    for n in ICON_NAMES:
+        path = icon_dir / f"{n}.png"
+        out[n] = f"data:image/png;base64,{base64.b64encode(_icon_png(path)).decode('ascii')}" if path.exists() else ""
+    return out
+
+
+def warm_up() -> None:
+    # Every icon set in use: the default one and each tenant's own icons_dir
+    dirs = {ICON_DIR}
+    try:
+        dirs |= {t.icons_dir for t in load_tenants().values() if t.icons_dir}
+    except Exception:  # a bad tenants file is reported by the page itself
+        pass
+    for icon_dir in dirs:
+        icon_data_uris(icon_dir)
+
+
+def render() -> None:
+    tenant = current_tenant()
+    icon_dir = tenant.icons_dir or ICON_DIR
+    st.title("Architecture (Icons)")
+
+    # --- 1) Icons as data URIs (read once per process and icon set) ---
+    icons = icon_data_uris(icon_dir)
+    missing = [n for n, uri in icons.items() if not uri]
+    if missing:
+        st.warning(
+            "Missing icons in: " + icon_dir.as_posix() +
+            "\n- " + "\n- ".join(f"{m}.png" for m in missing)
+        )
+
+    # --- 2) Responsive SVG (layout & markup live in icons_svg.py) ---
+    html = build_icons_html(icons, tenant.compliance_label)
+
+    # components.html needs a fixed iframe height; the SVG scales to width inside
+    components.html(html, height=VH + 80, scrolling=False)
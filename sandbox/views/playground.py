@@ -0,0 +1,241 @@
+"""Playground page: checklist & draft prototype with step-4 tools, export and approval."""
+from __future__ import annotations
+
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import streamlit as st
+
+from reporting import build_checklist, build_draft
+from resources import (
+    current_tenant, get_audit_log, get_exporter, get_ingestor, get_knowledge_graph, get_kpi_engine, get_telemetry,
+    get_tool_registry,
+)
+from step4_tools import run_step4
+
+
+def render() -> None:
+    tenant = current_tenant()
+    st.title("Playground: checklist & draft prototype")
+    st.markdown("**Goal:** prepare a requirements checklist and a report skeleton to send to the insurer.")
+
+    with st.form("form_playground"):
+        colA, colB = st.columns(2)
+        with colA:
+            insurer = st.text_input("Insurance company", placeholder=f"e.g., {next(iter(tenant.insurers), 'SaludPlus')}")
+            trigger = st.text_input("Medical Act (trigger)", placeholder="e.g., outpatient surgery / sick leave")
+            diagnosis = st.text_input("Primary diagnosis / reason", placeholder="e.g., acute lumbosciatica")
+        with colB:
+            date_val = st.date_input("Report date")
+            professional = st.text_input("Responsible clinician", placeholder="Dr./MD ____")
+            case_id = st.text_input("Case / Folio (optional)")
+
+        st.markdown("**Clinical evolution / changes since last report**")
+        evolution = st.text_area(
+            "Enter ONLY the changes with their date",
+            height=120,
+            placeholder="Ex.: 2025-09-12: physiotherapy started; 2025-09-14: pain decreased to 3/10…",
+        )
+        uploads = st.file_uploader(
+            "Attachments (PDF / HTML, optional)", type=["pdf", "html", "htm", "txt"], accept_multiple_files=True,
+        )
+
+        submitted = st.form_submit_button("Generate checklist + draft")
+
+    if submitted:
+        telemetry = get_telemetry()
+        run_id = case_id or None
+        kg = get_knowledge_graph(tenant.tenant_id)
+        # Step 4: knowledge-base lookups (cached), then templates & validators as one parallel tool batch
+        with telemetry.step("step4.tools", run_id=run_id):
+            attachments = kg.required_attachments(insurer, trigger)
+            # Uploaded files are read on the ingestor's job thread while the rest of the page renders
+            report_future = None
+            if uploads:
+                from ingest import save_uploads
+                upload_dir = tempfile.TemporaryDirectory()
+                report_future = get_ingestor(tenant.tenant_id).submit_check(
+                    save_uploads(uploads, Path(upload_dir.name)), attachments)
+                report_future.add_done_callback(lambda _: upload_dir.cleanup())
+            benefits = kg.benefits_for(insurer, trigger)
+            step4 = run_step4(
+                get_tool_registry(), insurer=insurer, trigger=trigger, diagnosis=diagnosis,
+                professional=professional, evolution=evolution, rules=kg.rules_for(insurer),
+            )
+
+        st.subheader("Suggested checklist")
+        with telemetry.step("step5.checklist", run_id=run_id):
+            checklist = build_checklist(
+                insurer=insurer, trigger=trigger, diagnosis=diagnosis, date_val=date_val,
+                case_id=case_id, evolution=evolution, attachments=attachments,
+                compliance_label=tenant.compliance_label,
+            )
+        st.markdown(checklist)
+        if benefits:
+            st.caption("Benefits activated: " + "; ".join(f"{b['benefit']} ({b['plan']} plan)" for b in benefits))
+
+        # Attachment completeness: uploaded files are ingested (text cached by file hash) and matched to the checklist
+        report = None
+        if report_future is not None:
+            with telemetry.step("step4.attachments", run_id=run_id), st.spinner("Reading attachments…"):
+                report = report_future.result()
+            st.metric("Attachment completeness", f"{100 * report.completeness:.0f}%",
+                      help="Required attachments found in the uploaded files (optional ones not counted).")
+            names = {doc.path: up.name for doc, up in zip(report.documents, uploads)}
+            for label in attachments:
+                where = next((f"{names[d.path]}, p. {d.detected[label]}" for d in report.documents
+                              if label in d.detected), None)
+                mark = "✅" if where else ("➖" if label in report.optional_missing else "❌")
+                st.caption(f"{mark} {label}" + (f" — {where}" if where else ""))
+            for doc in report.documents:
+                if doc.error:
+                    st.warning(f"Could not read an attachment: {doc.error}")
+
+        with st.expander("Step 4 — tool checks", expanded=False):
+            missing_fields = step4["check_required_fields"]
+            evo_check = step4["validate_evolution"]
+            if missing_fields.ok and missing_fields.value:
+                st.warning("Missing fields: " + ", ".join(missing_fields.value))
+            if evo_check.ok and evo_check.value["issues"]:
+                st.warning("Evolution entries:\n- " + "\n- ".join(evo_check.value["issues"]))
+            for res in step4.values():
+                status = "cached" if res.cached else f"{res.elapsed*1000:.0f} ms"
+                st.caption(f"`{res.name}` — {'ok' if res.ok else res.error} ({status})")
+
+        st.subheader("Report draft (skeleton)")
+        with telemetry.step("step5.draft", run_id=run_id):
+            draft = build_draft(
+                insurer=insurer, trigger=trigger, diagnosis=diagnosis, date_val=date_val,
+                professional=professional, case_id=case_id, evolution=evolution,
+                compliance_label=tenant.compliance_label,
+            )
+        st.code(draft, language="markdown")
+
+        # --- Export: signed PDF + JSON (rendered on click, off the script thread) ---
+        case = {
+            "insurer": insurer, "trigger": trigger, "diagnosis": diagnosis, "date_val": str(date_val),
+            "professional": professional, "case_id": case_id, "evolution": evolution, "draft": draft,
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        exporter = get_exporter(tenant.tenant_id)
+        audit = get_audit_log(tenant.tenant_id)
+        case_key = case_id or exporter.export_name(case)
+        audit.append(
+            "draft.generated", case_id=case_key, actor=professional or "clinician",
+            insurer=insurer, trigger=trigger,
+            step4={name: ("ok" if res.ok else res.error) for name, res in step4.items()},
+            attachments=None if report is None else {"present": report.present, "missing": report.missing},
+        )
+
+        def download(kind: str) -> bytes:
+            with telemetry.step(f"step8.export_{kind}", run_id=run_id):
+                bundle = exporter.export(case)
+            audit.append(f"export.{kind}", case_id=case_key, actor=professional or "clinician", name=bundle.name)
+            return getattr(bundle, kind)
+
+        e1, e2 = st.columns(2)
+        with e1:
+            st.download_button(
+                "Download report (.pdf)", lambda: download("pdf"),
+                file_name=f"{exporter.export_name(case)}.pdf", mime="application/pdf", on_click="ignore",
+            )
+        with e2:
+            st.download_button(
+                "Download signed report (.json)", lambda: download("json"),
+                file_name=f"{exporter.export_name(case)}.json", mime="application/json", on_click="ignore",
+            )
+
+        # --- Step 9: human approval (fragment → reruns without clearing the draft) ---
+        @st.fragment
+        def approval():
+            # One approval per case and session: a second click must not re-append or re-count the KPI event
+            approved = st.session_state.setdefault("playground_approved", set())
+            clicked = st.button("Approve draft (step 9)", key="playground_approve", disabled=case_key in approved)
+            if clicked and case_key not in approved:
+                approved.add(case_key)
+                with telemetry.step("step9.approval", run_id=run_id):
+                    audit.append("hitl.approved", case_id=case_key, actor=professional or "clinician").result(timeout=5)
+                if report is not None:
+                    # Approved → submitted: the measured completeness feeds the KPI rollups
+                    import pandas as pd
+                    present, required = report.kpi_counts()
+                    get_kpi_engine(tenant.tenant_id).ingest(pd.DataFrame([{
+                        "ts": datetime.now(timezone.utc), "case_id": case_key, "event": "submitted",
+                        "insurer": insurer, "clinician": professional or "clinician",
+                        "attachments_present": present, "attachments_required": required,
+                    }]))
+            if case_key in approved:
+                st.success("Approval recorded in the audit trail.")
+            with st.expander("Audit trail for this case", expanded=False):
+                audit.flush(timeout=5)
+                for rec in audit.records_for_case(case_key):
+                    st.caption(f"#{rec['seq']} {rec['ts']} — `{rec['event']}` by {rec['actor']} · {rec['hash'][:12]}…")
+
+        approval()
+
+    # --- Bulk export: many cases → one signed ZIP, built off the script thread ---
+    with st.expander("Bulk export (cases as JSON lines → ZIP)", expanded=False):
+        bulk_export(tenant)
+
+    st.caption("This playground does not replace clinical or legal judgment; it supports the operational flow.")
+
+
+def bulk_export(tenant) -> None:
+    """Start a bulk export job for this session; its status polls in a fragment, so reruns never wait on it."""
+    from export import iter_cases_jsonl
+
+    upload = st.file_uploader("Cases (.jsonl, one case object per line)", type=["jsonl", "json", "txt"],
+                              key="bulk_cases")
+    job = st.session_state.get("bulk_export")
+    running = job is not None and not job["future"].done()
+    if st.button("Start bulk export", key="bulk_start", disabled=upload is None or running):
+        if job is not None:
+            shutil.rmtree(job["dir"], ignore_errors=True)
+        work = Path(tempfile.mkdtemp(prefix="bulk_export_"))
+        (work / "cases.jsonl").write_bytes(upload.getvalue())
+        done = [0]
+        audit = get_audit_log(tenant.tenant_id)
+        future = get_exporter(tenant.tenant_id).submit_bulk(
+            iter_cases_jsonl(work / "cases.jsonl"), work / "reports.zip",
+            progress=lambda n: done.__setitem__(0, n),
+        )
+        future.add_done_callback(lambda f: audit.append(
+            "export.bulk", actor="clinician", source=upload.name,
+            count=done[0], error=None if f.exception() is None else repr(f.exception()),
+        ))
+        job = st.session_state["bulk_export"] = {
+            "future": future, "dir": work, "done": done, "name": f"{Path(upload.name).stem}_reports.zip",
+        }
+    if job is not None:
+        job["polling"] = not job["future"].done()
+        st.fragment(run_every=1.0 if job["polling"] else None)(_bulk_status)()
+
+
+def _bulk_status() -> None:
+    job = st.session_state["bulk_export"]
+    future = job["future"]
+    if not future.done():
+        st.caption(f"Exporting… {job['done'][0]} case(s) written so far.")
+        return
+    if job["polling"]:
+        job["polling"] = False
+        st.rerun()  # stop the polling timer
+    if future.exception() is not None:
+        st.error(f"Bulk export failed: {future.exception()}")
+        return
+    summary = future.result()
+    st.success(f"Exported {summary['count']} case(s), {summary['bytes'] / 1024:.0f} KB.")
+    st.download_button(
+        "Download reports (.zip)", lambda: Path(summary["path"]).read_bytes(),
+        file_name=job["name"], mime="application/zip", on_click="ignore", key="bulk_download",
+    )
+
+
+def warm_up() -> None:
+    # PDF export imports pymupdf on first use; load it before the first download
+    try:
+        import pymupdf  # noqa: F401
+    except ImportError:
+        pass
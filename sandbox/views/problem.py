@@ -0,0 +1,41 @@
+"""Problem Statement page."""
+from __future__ import annotations
+
+import streamlit as st
+
+
+def render() -> None:
+    st.title("Reports to activate health insurance benefits")
+
+    st.markdown(
+        """
+        **Core problem:** the **medical reports** needed to activate **health insurance benefits**
+        arrive **incomplete**, **late**, or get **rejected**, impacting both patient and insurer.
+        """
+    )
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.subheader("Healthcare professional")
+        st.markdown(
+            "- Submits **health reports**\n"
+            "  - They can remain **unfinished**\n"
+            "  - They can be **delayed**"
+        )
+    with c2:
+        st.subheader("Patient")
+        st.markdown(
+            "- **Does not receive** benefits on time\n"
+            "- Risk of **rejection** due to requirements"
+        )
+    with c3:
+        st.subheader("Health insurance company")
+        st.markdown(
+            "- **Does not orchestrate** a better system\n"
+            "- Needs **standardization** and **traceability**"
+        )
+
+    st.info(
+        "Goal: use an **agent** (LLM + memory/knowledge/tools) to orchestrate a flow that ensures "
+        "complete, on-time, policy-compliant reports."
+    )
@@ -0,0 +1,166 @@
+"""Solution & Key Roles page (RACI table and measured KPIs)."""
+from __future__ import annotations
+
+import pandas as pd
+import streamlit as st
+
+from resources import current_tenant, get_kpi_engine
+
+
+def render() -> None:
+    st.title("Solution & Key Roles")
+    st.caption("A concise view of value, responsibilities, KPIs, and interfaces for each actor.")
+
+    # --- Solution overview and outcomes ---
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Solution (high-level)")
+        st.markdown(
+            """
+- Orchestrate medical report creation with an **Agent** (LLM + memory/knowledge/tools).
+- Standardize content with **policy-aware templates** and **checklists**.
+- Reduce **rejections** and **delays**, improve **traceability** and **auditability**.
+- Keep **human-in-the-loop** for clinical and legal sense.
+            """
+        )
+    with c2:
+        st.subheader("Key outcomes")
+        st.markdown(
+            """
+- **Fewer rejections** and **on-time approvals**.
+- **Lower clinician time** per report (guided draft + validations).
+- **Transparency** for patient and insurer (status & history).
+- **Compliance-by-design** (HIPAA / GDPR, logging, minimization).
+            """
+        )
+
+    st.divider()
+
+    # --- Roles & responsibilities (expanders) ---
+    st.subheader("Roles & responsibilities")
+    with st.expander("Patient — legitimate requester", expanded=False):
+        st.markdown(
+            """
+**Responsibilities**
+- Provide consent, identity and required documents.
+- Review status and supply missing information.
+
+**Value**
+- On-time benefit activation, fewer re-requests, clear status visibility.
+            """
+        )
+    with st.expander("Healthcare professional — clinical author", expanded=False):
+        st.markdown(
+            """
+**Responsibilities**
+- Enter clinical facts; validate the final draft.
+- Sign and submit with the required attachments.
+
+**Value**
+- Guided drafting with less friction; fewer back-and-forths with insurer.
+            """
+        )
+    with st.expander("Agent (LLM + tools) — orchestrator/planner", expanded=True):
+        st.markdown(
+            """
+**Responsibilities**
+- Apply **templates** and **policy checks**; assemble attachments.
+- Run **consistency/coverage** validations; format and export.
+- Keep **audit trail** and surface traceable status.
+
+**Value**
+- Time savings for the clinician; higher first-pass yield.
+            """
+        )
+    with st.expander("Health insurance company — policy & adjudication", expanded=False):
+        st.markdown(
+            """
+**Responsibilities**
+- Publish **requirements/policies**; provide decision/status channel.
+- Return structured feedback on **rejection reasons**.
+
+**Value**
+- Standardized submissions; lower adjudication cost and cycle time.
+            """
+        )
+    with st.expander("Governance/Compliance — boundary & audit", expanded=False):
+        st.markdown(
+            """
+**Responsibilities**
+- Define the **compliance boundary** (HIPAA/GDPR), logging, and retention.
+- Approve templates, data minimization, and access control.
+
+**Value**
+- Risk reduction and verifiable conformance-by-design.
+            """
+        )
+
+    st.divider()
+
+    # --- Lightweight RACI matrix ---
+    st.subheader("RACI (lightweight)")
+    raci = pd.DataFrame(
+        [
+            ["Collect identity & consent",           "I", "C", "R", "A", "C"],
+            ["Draft clinical report",                "I", "A", "R", "C", "C"],
+            ["Assemble attachments",                 "I", "C", "R", "A", "C"],
+            ["Policy/coverage validation",           "I", "C", "R", "A", "A"],
+            ["Submit & track status",                "I", "A", "R", "C", "C"],
+            ["Feedback loop / template updates",     "I", "C", "R", "A", "A"],
+        ],
+        columns=["Task", "Patient", "Clinician", "Agent", "Insurer", "Compliance"],
+    )
+    st.dataframe(raci, use_container_width=True)
+
+    st.divider()
+
+    # --- KPIs and Interfaces ---
+    c3, c4 = st.columns(2)
+    with c3:
+        st.subheader("KPIs (suggested)")
+        st.markdown(
+            """
+- **First-pass approval rate** (%)
+- **Minutes per report** (clinician)
+- **Rejection rate** and **top reasons**
+- **Cycle time** (request → approval)
+- **Attachment completeness** (%)
+            """
+        )
+        kpi_engine = get_kpi_engine(current_tenant().tenant_id)
+        if kpi_engine.events_ingested:
+            k = kpi_engine.summary()
+            fmt = lambda v, unit="": "—" if v is None else f"{v:,.1f}{unit}"
+            k1, k2, k3 = st.columns(3)
+            k1.metric("First-pass approval", fmt(k["first_pass_approval_pct"], "%"))
+            k2.metric("Minutes / report", fmt(k["minutes_per_report"]))
+            k3.metric("Rejection rate", fmt(k["rejection_rate_pct"], "%"))
+            k4, k5, k6 = st.columns(3)
+            k4.metric("Cycle time (days)", fmt(k["cycle_time_days"]))
+            k5.metric("Attachment completeness", fmt(k["attachment_completeness_pct"], "%"))
+            k6.metric("Reports", f"{k['reports']:,.0f}")
+            reasons = kpi_engine.top_reasons()
+            if not reasons.empty:
+                st.caption("Top rejection reasons: " + ", ".join(f"{r} ({n:,.0f})" for r, n in reasons.items()))
+        else:
+            st.caption("Measured values appear here once case events are loaded (Impact → Measured data).")
+    with c4:
+        st.subheader("Interfaces")
+        st.markdown(
+            """
+- **Templates/Policies API** (insurer → agent)
+- **Status/Decisions API** (insurer → agent)
+- **Export** (PDF signed + JSON)
+- **Audit trail** (immutable logs)
+            """
+        )
+
+    # --- Assumptions & Limits ---
+    st.markdown(
+        """
+> **Assumptions & Limits**
+> - RACI is indicative and should be validated with stakeholders.
+> - APIs and templates are placeholders; connect to real endpoints as available.
+> - Keep human-in-the-loop for clinical/legal accountability.
+        """
+    )
@@ -0,0 +1,73 @@
+"""Technology Stack page."""
+from __future__ import annotations
+
+import streamlit as st
+
+from resources import current_tenant
+
+
+def render() -> None:
+    compliance = current_tenant().compliance_label
+    st.title("Technology Stack (High-Level Architecture)")
+
+    dot = r"""
+    digraph G {
+      rankdir=LR; splines=spline; fontname="Helvetica";
+      node [shape=box, style="rounded", fontsize=11, fontname="Helvetica"];
+      edge [fontsize=10, fontname="Helvetica"];
+
+      subgraph cluster_comp {
+        label="Compliance Boundary: HIPAA / GDPR";
+        color=red;
+
+        profile     [label="Agent Profile"];
+        orchestrator[label="Agent\n(Orchestrator & Planner)"];
+        langchain   [label="LangChain\n(LLM + Tools orchestration)"];
+        langgraph   [label="LangGraph\n(Graph-based workflow)"];
+        memory      [label="Memory store"];
+        knowledge   [label="Knowledge base"];
+        tools       [label="Specialized Tools"];
+        system      [label="System message / policies"];
+
+        profile -> orchestrator [label="context"];
+        orchestrator -> langchain;
+        orchestrator -> langgraph;
+        langchain -> memory;
+        langchain -> knowledge;
+        langchain -> tools;
+        langgraph -> memory;
+        langgraph -> tools;
+        system -> orchestrator [label="policy"];
+      }
+
+      patient  [label="Patient Request / Trigger"];
+      clinician[label="Healthcare Professional"];
+      insurer  [label="Insurance Company"];
+
+      patient  -> profile;
+      clinician-> profile;
+      insurer  -> profile;
+
+      orchestrator -> insurer [label="reports / status"];
+      insurer -> system       [label="rules / templates"];
+
+      subgraph cluster_interop {
+        label="Interoperability & Standards";
+        color=gray;
+        mcp [label="MCP\n(Model Context Protocol)"];
+      }
+      mcp -- orchestrator [style=dashed, label="tool/runtime interop"];
+    }
+    """
+    dot = dot.replace("HIPAA / GDPR", compliance.replace('"', "'"))  # tenant label
+    st.graphviz_chart(dot, use_container_width="stretch")
+
+    st.subheader("Key Elements")
+    st.markdown(f"""
+- **LangChain** — LLM calls, tools, structured prompting (drafts, validations, ontology queries).  
+- **LangGraph** — graph/state-based control for multi-step flows (auditable steps 1–9).  
+- **Memory & Knowledge** — prior reports, insurer rules, compliance templates (RAG).  
+- **Tools** — validators, template generators, EHR/insurer connectors.  
+- **MCP (Model Context Protocol)** — interoperability across LLM runtimes/agents.  
+- **Compliance boundary** — {compliance} guardrails with human-in-the-loop.
+    """)